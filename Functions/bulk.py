@@ -0,0 +1,185 @@
+# ----------------------------
+# OUT-OF-CORE BULK PROCESSING
+# ----------------------------
+# Streaming path for the complete WDI / IMF WEO bulk CSVs. The wide file is read
+# in chunks, every chunk is melted with melt_years() and appended to a long
+# Parquet store partitioned by country. The pivot step then works one country
+# partition at a time. Peak memory depends on the chunk size and on the size of
+# one country, never on the size of the whole file.
+
+import os
+import shutil
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from Functions.reshape import melt_years
+
+
+PARTITION_COLUMN = "Country Name"
+
+# WDI bulk layout (WDICSV.csv / API_*.csv)
+WDI_SPEC = {"country_col": "Country Name", "indicator_col": "Indicator Name"}
+
+# IMF WEO bulk layout (values are formatted with thousands separators). A
+# Subject Descriptor repeats under several Units (national currency, U.S.
+# dollars, PPP share, ...), so the indicator is "<descriptor> (<units>)"
+WEO_SPEC = {"country_col": "Country", "indicator_col": "Subject Descriptor", "units_col": "Units",
+            "read_csv": {"thousands": ",", "encoding": "latin-1", "sep": "\t"}}
+
+_LONG_SCHEMA = pa.schema([
+    ("Country Name", pa.string()),
+    ("Indicator Name", pa.string()),
+    ("Year", pa.int16()),
+    ("Value", pa.float64()),
+])
+
+
+# ----------------------------
+# Function 1: Stream a bulk CSV as long chunks
+# ----------------------------
+def iter_long_chunks(path, spec=WDI_SPEC, chunksize=20000, countries=None):
+    """
+    Reads a wide bulk CSV `chunksize` rows at a time and yields long DataFrames
+    ['Country Name', 'Indicator Name', 'Year', 'Value'] (empty cells dropped).
+    """
+    read_kwargs = dict(spec.get("read_csv", {}))
+    reader = pd.read_csv(path, chunksize=chunksize, low_memory=False, **read_kwargs)
+    for wide_chunk in reader:
+        long_chunk = melt_years([(wide_chunk, spec)], countries=countries)
+        if not long_chunk.empty:
+            yield long_chunk
+
+
+# ----------------------------
+# Function 2: Build the partitioned long store
+# ----------------------------
+def build_long_store(path, store_dir, spec=WDI_SPEC, chunksize=20000, countries=None):
+    """
+    Streams a bulk CSV into a Parquet dataset under store_dir, hive-partitioned
+    by country (store_dir/Country Name=<name>/*.parquet).
+
+    A re-run replaces the store: chunks are appended to a temporary directory
+    next to store_dir, which is swapped in once the whole file is written.
+
+    Returns:
+    - number of long rows written
+    """
+    store_dir = os.path.abspath(store_dir)
+    tmp_dir = f"{store_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    rows = 0
+    try:
+        for long_chunk in iter_long_chunks(path, spec, chunksize, countries):
+            table = pa.Table.from_pandas(long_chunk, preserve_index=False).cast(_LONG_SCHEMA)
+            pq.write_to_dataset(table, tmp_dir, partition_cols=[PARTITION_COLUMN])
+            rows += table.num_rows
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # Directories cannot be replaced atomically: move the old store aside first
+    old_dir = f"{store_dir}.old-{os.getpid()}"
+    if os.path.exists(store_dir):
+        os.replace(store_dir, old_dir)
+    os.replace(tmp_dir, store_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return rows
+
+
+def open_long_store(store_dir):
+    """
+    Returns the long store as a pyarrow dataset (nothing is read yet).
+    """
+    return ds.dataset(store_dir, format="parquet", partitioning="hive")
+
+
+def store_labels(store_dir, column="Indicator Name"):
+    """
+    Returns the sorted distinct values of a column, scanned batch by batch.
+    """
+    if column == PARTITION_COLUMN:
+        return sorted(_partition_values(store_dir))
+
+    labels = set()
+    for batch in open_long_store(store_dir).to_batches(columns=[column]):
+        labels.update(batch.column(0).unique().to_pylist())
+    labels.discard(None)
+    return sorted(labels)
+
+
+def _partition_values(store_dir):
+    dataset = open_long_store(store_dir)
+    values = set()
+    for fragment in dataset.get_fragments():
+        keys = ds.get_partition_keys(fragment.partition_expression)
+        values.add(keys[PARTITION_COLUMN])
+    return values
+
+
+# ----------------------------
+# Function 3: Pivot one country partition at a time
+# ----------------------------
+def build_wide_store(store_dir, wide_dir, indicators=None):
+    """
+    Streaming version of
+        df.pivot_table(index=['Country Name', 'Year'], columns='Indicator Name', values='Value')
+
+    Each country partition is read, pivoted and written on its own to
+    wide_dir/Country Name=<name>/part-0.parquet. All partitions share the same
+    column set (`indicators`, default: every indicator in the store).
+
+    Returns:
+    - number of (country, year) rows written
+    """
+    if indicators is None:
+        indicators = store_labels(store_dir, "Indicator Name")
+    dataset = open_long_store(store_dir)
+
+    rows = 0
+    for country in sorted(_partition_values(store_dir)):
+        part = dataset.to_table(
+            columns=["Indicator Name", "Year", "Value"],
+            filter=(ds.field(PARTITION_COLUMN) == country) & ds.field("Indicator Name").isin(indicators),
+        ).to_pandas()
+        if part.empty:
+            continue
+
+        wide = part.pivot_table(index="Year", columns="Indicator Name", values="Value")
+        wide = wide.reindex(columns=indicators).reset_index()
+        wide.columns.name = None
+        wide.insert(0, "Country Name", country)
+
+        out_dir = os.path.join(wide_dir, f"{PARTITION_COLUMN}={_escape(country)}")
+        os.makedirs(out_dir, exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(wide.drop(columns="Country Name"), preserve_index=False),
+                       os.path.join(out_dir, "part-0.parquet"))
+        rows += len(wide)
+    return rows
+
+
+def _escape(value):
+    # Same URI encoding pyarrow uses for hive partition directories
+    return quote(str(value), safe="")
+
+
+def read_wide_store(wide_dir, countries=None, columns=None):
+    """
+    Reads (part of) the wide store back into a DataFrame in the same shape as
+    pivot_table(...).reset_index(): ['Country Name', 'Year', <indicators>].
+    Only the requested countries' partitions and columns are read.
+    """
+    dataset = ds.dataset(wide_dir, format="parquet", partitioning="hive")
+    read_columns = None
+    if columns is not None:
+        read_columns = [PARTITION_COLUMN, "Year"] + [c for c in columns if c not in (PARTITION_COLUMN, "Year")]
+    row_filter = ds.field(PARTITION_COLUMN).isin(countries) if countries is not None else None
+
+    df = dataset.to_table(columns=read_columns, filter=row_filter).to_pandas()
+    ordered = [PARTITION_COLUMN, "Year"] + [c for c in df.columns if c not in (PARTITION_COLUMN, "Year")]
+    df[PARTITION_COLUMN] = df[PARTITION_COLUMN].astype(str)
+    return df[ordered].sort_values([PARTITION_COLUMN, "Year"]).reset_index(drop=True)
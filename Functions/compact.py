@@ -0,0 +1,105 @@
+# ----------------------------
+# COMPACT LONG TABLE
+# ----------------------------
+# The long indicator table (Country Name, Indicator Name, Year, Value) as
+# dictionary-encoded categoricals + int16 years + float32 values. Equality and
+# isin masks on a categorical compare small integer codes instead of strings.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+LONG_DTYPES = {
+    "Country Name": "category",
+    "Indicator Name": "category",
+    "Year": "int16",
+    "Value": "float32",
+}
+
+
+# ----------------------------
+# Function 1: Convert / load
+# ----------------------------
+def compact_long_table(df):
+    """
+    Returns a copy of the long table with compact dtypes.
+    Rows without a Year are dropped (int16 cannot hold NaN).
+    """
+    df = df.copy()
+    df.columns = [c.strip() for c in df.columns]
+    if df["Year"].isna().any():
+        df = df[df["Year"].notna()]
+    return df.astype({c: t for c, t in LONG_DTYPES.items() if c in df.columns})
+
+
+def load_compact_csv(path):
+    """
+    Reads the long table CSV (local path or URL) straight into compact dtypes.
+    """
+    df = pd.read_csv(path, dtype={"Country Name": "category", "Indicator Name": "category"})
+    return compact_long_table(df)
+
+
+# ----------------------------
+# Function 2: Memory + filter speed report
+# ----------------------------
+def _best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def compact_report(df, countries=None, indicator=None, repeat=20):
+    """
+    Compares the original long table with its compact version.
+
+    Measures the memory footprint and the masks used in Functions/functions.py:
+    - filter_data:             Country == c & Indicator == i
+    - plot_indicator_plotly:   Country.isin(countries) & Indicator == i & Year range
+    - plot_two_indicators_long: Country.isin(countries) & Indicator.isin([i1, i2])
+
+    Returns:
+    - DataFrame with one row per measurement: ['metric', 'original', 'compact', 'ratio']
+    """
+    compact = compact_long_table(df)
+
+    if countries is None:
+        countries = list(pd.unique(df["Country Name"]))[:5]
+    if indicator is None:
+        indicator = df["Indicator Name"].iloc[0]
+    indicators = list(pd.unique(df["Indicator Name"]))[:2]
+    country = countries[0]
+
+    def masks(d):
+        return {
+            "filter_data mask (ms)": lambda: (d["Country Name"] == country) & (d["Indicator Name"] == indicator),
+            "plot_indicator_plotly mask (ms)": lambda: (
+                d["Country Name"].isin(countries) & (d["Indicator Name"] == indicator) &
+                (d["Year"] >= 2000) & (d["Year"] <= 2023)
+            ),
+            "plot_two_indicators_long mask (ms)": lambda: (
+                d["Country Name"].isin(countries) & d["Indicator Name"].isin(indicators)
+            ),
+        }
+
+    rows = [{
+        "metric": "memory (MB)",
+        "original": df.memory_usage(deep=True).sum() / 1e6,
+        "compact": compact.memory_usage(deep=True).sum() / 1e6,
+    }]
+    original_masks, compact_masks = masks(df), masks(compact)
+    for name in original_masks:
+        rows.append({
+            "metric": name,
+            "original": _best_ms(original_masks[name], repeat),
+            "compact": _best_ms(compact_masks[name], repeat),
+        })
+
+    report = pd.DataFrame(rows)
+    report["ratio"] = report["original"] / report["compact"].replace(0, np.nan)
+    return report
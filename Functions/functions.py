@@ -2,12 +2,98 @@
 # FUNCTIONS
 # ----------------------------
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
 
+from Functions.indexing import FilterIndex, get_filter_index, get_year_index, resolve_year_range
+from Functions.interning import COUNTRIES, INDICATORS, key_mask
+from Functions.panel import PanelCube
+from Functions.ranking import RankingEngine
+from Functions.result_cache import RESULT_CACHE, canonical_key
+from Functions.sql_backend import IndicatorDB
+from Functions.versioning import registered_version
+
+
+# ----------------------------
+# Helper: split a filtered frame into all per-country series in one pass
+# ----------------------------
+def split_series(df_filtered, countries, value_column="Value"):
+    """
+    Splits a (Year-sorted) filtered dataframe into one series per country with a
+    single stable sort on the country codes, instead of one boolean mask per
+    country inside the plotting loop.
+
+    Returns:
+    - [(position in countries, country, years, values)] for countries with rows,
+      in the order of `countries`
+    """
+    codes, labels = pd.factorize(df_filtered["Country Name"])
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+
+    years = df_filtered["Year"].to_numpy()[order]
+    values = df_filtered[value_column].to_numpy()[order]
+    positions = {label: k for k, label in enumerate(labels)}
+
+    series = []
+    for i, country in enumerate(countries):
+        k = positions.get(country)
+        if k is not None:
+            series.append((i, country, years[bounds[k]:bounds[k + 1]], values[bounds[k]:bounds[k + 1]]))
+    return series
+
+
+# ----------------------------
+# Helper: per-country series from the long table or a PanelCube
+# ----------------------------
+def _country_series(data, countries, indicator, year_range=None):
+    """
+    Returns [(position in countries, country, years, values)] for every selected
+    country that has rows for the indicator in the year range (default YEAR_RANGE).
+    `data` is the long DataFrame, a PanelCube or an IndicatorDB.
+    Names may be aliases; the series are labelled with the names as passed.
+    """
+    year_min, year_max = resolve_year_range(year_range)
+    # Canonical labels for the lookups, passed names for the legend
+    canonical = [COUNTRIES.canonical(c) for c in countries]
+    indicator = INDICATORS.canonical(indicator)
+
+    if isinstance(data, IndicatorDB):
+        data = data.series(canonical, indicator, year_min, year_max)
+        return [(i, countries[i], years, values) for i, _, years, values in split_series(data, canonical)]
+    if isinstance(data, PanelCube):
+        labels, years, values = data.series(canonical, indicator, year_min, year_max)
+        rows = dict(zip(labels, values))
+        return [
+            (i, country, years, rows[label])
+            for i, (country, label) in enumerate(zip(countries, canonical))
+            if label in rows and not np.isnan(rows[label]).all()
+        ]
+
+    # Year-sorted runs per (country, indicator), built once per registered dataset
+    # version (other frames: over the selected rows only); each series is a dict
+    # hit plus two binary searches on its years
+    def extract():
+        keys = [(label, indicator) for label in canonical]
+        index = data if isinstance(data, FilterIndex) else get_filter_index(data, keys)
+        return {canonical[i]: (years, values)
+                for i, _, years, values in index.series(keys, "Value", (year_min, year_max))}
+
+    version = None if isinstance(data, FilterIndex) else registered_version(data)
+    if version is None:
+        by_country = extract()
+    else:
+        # Shared result cache (registered datasets): the same selection in any order / session is extracted once
+        key = canonical_key("country_series", version, canonical, indicator, (year_min, year_max))
+        by_country = RESULT_CACHE.get_or_compute(key, extract)
+    return [(i, country, *by_country[label])
+            for i, (country, label) in enumerate(zip(countries, canonical)) if label in by_country]
+
+
 # ----------------------------
 # Function 1: Filter data by country + indicator
 # ----------------------------
@@ -15,12 +101,38 @@ def filter_data(df, country, indicator):
     """
     Filters the dataframe by country and indicator,
     returns a dataframe sorted by Year.
+    Also accepts a PanelCube, a FilterIndex or an IndicatorDB instead of the long dataframe.
+    Country and indicator may be aliases (e.g. "Poland, Republic of").
     """
-    df_filtered = df[
-        (df["Country Name"] == country) &
-        (df["Indicator Name"] == indicator)
-    ].sort_values("Year")
-    return df_filtered
+    country, indicator = COUNTRIES.canonical(country), INDICATORS.canonical(indicator)
+    if isinstance(df, IndicatorDB):
+        return df.series([country], indicator)
+    if isinstance(df, PanelCube):
+        return df.to_long([country], [indicator], present_only=True)
+    if isinstance(df, FilterIndex):
+        return df.lookup(country, indicator)
+
+    version = registered_version(df)
+    if version is None:
+        # Arbitrary frames may be edited in place: filter directly, no cache
+        df_filtered = df[key_mask(df, country, indicator)].sort_values("Year")
+    else:
+        # Shared result cache for registered datasets (Functions/registry.py)
+        key = canonical_key("filter_data", version, [country], indicator)
+        df_filtered = RESULT_CACHE.get_or_compute(
+            key, lambda: df[key_mask(df, country, indicator)].sort_values("Year")
+        )
+    # Callers may modify the result; the cached frame stays untouched
+    return df_filtered.copy()
+
+
+def filter_data_indexed(df, country, indicator):
+    """
+    Same result as filter_data, but served from a FilterIndex that is built
+    once per registered dataset version (O(result) per lookup instead of O(rows)).
+    """
+    country, indicator = COUNTRIES.canonical(country), INDICATORS.canonical(indicator)
+    return get_filter_index(df, [(country, indicator)]).lookup(country, indicator)
 
 
 # ----------------------------
@@ -43,7 +155,7 @@ def plot_indicator(df_filtered, country, indicator):
 # ----------------------------
 # Function 5: Plot PCA scores for overview (INTERACTIVE)
 # ----------------------------
-def plot_pca_scores_plotly(df, countries, score_column):
+def plot_pca_scores_plotly(df, countries, score_column, year_range=None):
     """
     Creates an interactive Plotly line chart for PCA scores across multiple countries.
     Works with df structure: ['Country Name', 'Year', 'score_pca_economics', 'score_pca_wellbeing']
@@ -52,19 +164,17 @@ def plot_pca_scores_plotly(df, countries, score_column):
     - df: DataFrame with columns ['Country Name', 'Year', score_column]
     - countries: List of country names to plot
     - score_column: String, either 'score_pca_economics' or 'score_pca_wellbeing'
+    - year_range: (min, max) years shown, default YEAR_RANGE (Functions/indexing.py)
     
     Returns:
     - Plotly figure object
     """
-    # Filter data
-    df_filtered = df[
-        (df["Country Name"].isin(countries)) &
-        (df["Year"] >= 2000) &
-        (df["Year"] <= 2020)
-    ].sort_values("Year")
+    # Per-country runs sorted by year (built once per registered dataset version), sliced by binary search
+    canonical = [COUNTRIES.canonical(c) for c in countries]
+    series = get_year_index(df, keys=canonical).series(canonical, score_column, resolve_year_range(year_range))
     
     # Check if data exists
-    if df_filtered.empty:
+    if not series:
         fig = go.Figure()
         fig.add_annotation(
             text="No data available",
@@ -87,22 +197,20 @@ def plot_pca_scores_plotly(df, countries, score_column):
     colors = ['#667eea', '#f093fb', '#4facfe', '#fa709a', '#fee140', '#30cfd0', '#a8edea', '#fed6e3', '#96fbc4', '#f9f586']
     
     # Add a line for each country
-    for i, country in enumerate(countries):
-        df_country = df_filtered[df_filtered["Country Name"] == country]
-        
-        if not df_country.empty:
-            fig.add_trace(go.Scatter(
-                x=df_country["Year"],
-                y=df_country[score_column],
-                mode='lines+markers',
-                name=country,
-                line=dict(width=2.5, color=colors[i % len(colors)]),
-                marker=dict(size=6),
-                hovertemplate='<b>%{fullData.name}</b><br>' +
-                             'Year: %{x}<br>' +
-                             'Score: %{y:.2f}<br>' +
-                             '<extra></extra>'
-            ))
+    for i, _, years, scores in series:
+        country = countries[i]
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=scores,
+            mode='lines+markers',
+            name=country,
+            line=dict(width=2.5, color=colors[i % len(colors)]),
+            marker=dict(size=6),
+            hovertemplate='<b>%{fullData.name}</b><br>' +
+                         'Year: %{x}<br>' +
+                         'Score: %{y:.2f}<br>' +
+                         '<extra></extra>'
+        ))
     
     # Determine title based on score column
     title_text = "Economic Prosperity Score" if "economics" in score_column else "Well-being Score"
@@ -161,18 +269,17 @@ def plot_pca_scores_plotly(df, countries, score_column):
 # ----------------------------
 # Function 3: Compare two indicators across multiple countries
 # ----------------------------
-def plot_two_indicators_long(df, countries, ind1, ind2):
+def plot_two_indicators_long(df, countries, ind1, ind2, year_range=None):
     """
     Plots two indicators for multiple countries.
     ind1 -> solid line (left axis)
     ind2 -> dashed line (right axis)
+    df can be the long dataframe or a PanelCube.
+    year_range: (min, max) years shown, default YEAR_RANGE (Functions/indexing.py).
     """
-    # Filter data
-    df_f = df[
-        df["Country Name"].isin(countries) &
-        df["Indicator Name"].isin([ind1, ind2]) &
-        df["Year"].between(2000, 2023)
-    ]
+    # Per-country series for both indicators (empty if a country has no data)
+    series1 = {country: (x, y) for _, country, x, y in _country_series(df, countries, ind1, year_range)}
+    series2 = {country: (x, y) for _, country, x, y in _country_series(df, countries, ind2, year_range)}
 
     fig, ax1 = plt.subplots(figsize=(12, 7))
     colors = plt.cm.tab10.colors
@@ -180,8 +287,8 @@ def plot_two_indicators_long(df, countries, ind1, ind2):
     # Plot ind1 (solid) on left axis
     handles = []
     for i, country in enumerate(countries):
-        df_plot = df_f[(df_f["Country Name"] == country) & (df_f["Indicator Name"] == ind1)]
-        line, = ax1.plot(df_plot["Year"], df_plot["Value"],
+        x, y = series1.get(country, ([], []))
+        line, = ax1.plot(x, y,
                          color=colors[i % len(colors)],
                          linewidth=2, marker='o')
         handles.append(line)
@@ -194,8 +301,8 @@ def plot_two_indicators_long(df, countries, ind1, ind2):
     # Plot ind2 (dashed) on right axis
     ax2 = ax1.twinx()
     for i, country in enumerate(countries):
-        df_plot = df_f[(df_f["Country Name"] == country) & (df_f["Indicator Name"] == ind2)]
-        ax2.plot(df_plot["Year"], df_plot["Value"],
+        x, y = series2.get(country, ([], []))
+        ax2.plot(x, y,
                  color=colors[i % len(colors)],
                  linestyle='--', linewidth=2, marker='x')
 
@@ -215,22 +322,19 @@ def plot_two_indicators_long(df, countries, ind1, ind2):
 # ----------------------------
 # Function 4: Plot single indicator with Plotly (INTERACTIVE)
 # ----------------------------
-def plot_indicator_plotly(df, countries, indicator):
+def plot_indicator_plotly(df, countries, indicator, year_range=None):
     """
     Creates an interactive Plotly line chart for one indicator across multiple countries.
     Works well with dark themes, legend shows ONLY dots.
+    df can be the long dataframe or a PanelCube.
+    year_range: (min, max) years shown, default YEAR_RANGE (Functions/indexing.py).
     """
 
-    # Filter data
-    df_filtered = df[
-        (df["Country Name"].isin(countries)) &
-        (df["Indicator Name"] == indicator) &
-        (df["Year"] >= 2000) &
-        (df["Year"] <= 2023)
-    ].sort_values("Year")
+    # Per-country series
+    series = _country_series(df, countries, indicator, year_range)
 
     # Handle empty dataset
-    if df_filtered.empty:
+    if not series:
         fig = go.Figure()
         fig.add_annotation(
             text="No data available",
@@ -251,16 +355,13 @@ def plot_indicator_plotly(df, countries, indicator):
     colors = ['#667eea', '#f093fb', '#4facfe', '#fa709a', '#fee140', '#30cfd0', '#a8edea', '#fed6e3']
 
     # Add traces
-    for i, country in enumerate(countries):
-        df_c = df_filtered[df_filtered["Country Name"] == country]
-        if df_c.empty:
-            continue
+    for i, country, years, values in series:
         color = colors[i % len(colors)]
 
         # Trace with lines + markers
         fig.add_trace(go.Scatter(
-            x=df_c["Year"],
-            y=df_c["Value"],
+            x=years,
+            y=values,
             mode="lines+markers",
             line=dict(width=2.5, color=color),
             marker=dict(size=7, color=color),
@@ -690,12 +791,42 @@ import plotly.express as px
 import pandas as pd
 import numpy as np
 
-def plot_esi_wti_quadrants(df_merged_scores: pd.DataFrame):
+def interval_error_bars(df, intervals, value_column, score_column, axis='x'):
+    """
+    Adds bootstrap error bars around the displayed values of df.
 
-    df_final_ranking = df_merged_scores.groupby('Country Name').agg(
-        {'Economic Success (PCA)': 'mean',
-         'Well-Being (PCA)': 'mean'}
-    ).reset_index()
+    The interval widths (high - estimate, estimate - low) come from
+    index_bootstrap.window_intervals() and are placed around df[value_column],
+    so the displayed point estimates stay those of the chart's own data.
+
+    Returns:
+    - (df with '<value_column> +' / '<value_column> -' columns, px error_* kwargs)
+    """
+    widths = intervals[['Country Name']].copy()
+    widths[f'{value_column} +'] = intervals[f'{score_column} high'] - intervals[score_column]
+    widths[f'{value_column} -'] = intervals[score_column] - intervals[f'{score_column} low']
+    df = df.merge(widths, on='Country Name', how='left')
+    return df, {f'error_{axis}': f'{value_column} +', f'error_{axis}_minus': f'{value_column} -'}
+
+
+def plot_esi_wti_quadrants(df_merged_scores: pd.DataFrame, averages: pd.DataFrame = None,
+                           intervals: pd.DataFrame = None):
+    """
+    averages: optional precomputed per-country means with columns
+    ['Country Name', 'Economic Success (PCA)', 'Well-Being (PCA)']
+    (e.g. WindowAggregates.window_means), skips the groupby.
+    intervals: optional bootstrap output of index_bootstrap.window_intervals();
+    adds error bars around the plotted averages and the bootstrap probability
+    of the shown quadrant to the hover text.
+    """
+
+    if averages is None:
+        df_final_ranking = df_merged_scores.groupby('Country Name').agg(
+            {'Economic Success (PCA)': 'mean',
+             'Well-Being (PCA)': 'mean'}
+        ).reset_index()
+    else:
+        df_final_ranking = averages[['Country Name', 'Economic Success (PCA)', 'Well-Being (PCA)']].copy()
 
     df_final_ranking.rename(columns={
         'Economic Success (PCA)': 'Avg_ESI',
@@ -716,6 +847,18 @@ def plot_esi_wti_quadrants(df_merged_scores: pd.DataFrame):
     ]
     df_final_ranking['Country Group'] = np.select(conditions, choices, default='Central/Edge Case')
 
+    error_bars = {}
+    if intervals is not None:
+        for axis, avg, column in (('x', 'Avg_ESI', 'Economic Success (PCA)'), ('y', 'Avg_WTI', 'Well-Being (PCA)')):
+            df_final_ranking, bars = interval_error_bars(df_final_ranking, intervals, avg, column, axis)
+            error_bars.update(bars)
+        # Bootstrap probability of the quadrant shown for each country
+        probabilities = df_final_ranking[['Country Name']].merge(intervals, on='Country Name', how='left')
+        df_final_ranking['Quadrant probability'] = [
+            probabilities[f'P({group})'].iloc[k] if f'P({group})' in probabilities.columns else np.nan
+            for k, group in enumerate(df_final_ranking['Country Group'])
+        ]
+
     fig = px.scatter(
         df_final_ranking,
         x='Avg_ESI',
@@ -723,11 +866,13 @@ def plot_esi_wti_quadrants(df_merged_scores: pd.DataFrame):
         text='Country Name',
         color='Country Group',
         hover_name='Country Name',
+        hover_data={'Quadrant probability': ':.0%'} if intervals is not None else None,
         title='ESI vs. WTI Quadrant Analysis (Average 2000–2023)',
         labels={
             'Avg_ESI': 'Economic Success Index (ESI)',
             'Avg_WTI': 'Well-Being Translation Index (WTI)'
-        }
+        },
+        **error_bars
     )
 
     fig.update_traces(
@@ -755,7 +900,9 @@ def plot_esi_wti_quadrants(df_merged_scores: pd.DataFrame):
 import plotly.express as px
 import pandas as pd
 
-def plot_esi_ranking_bar(df_merged_scores: pd.DataFrame, top_n: int = 0, bottom_n: int = 0):
+def plot_esi_ranking_bar(df_merged_scores: pd.DataFrame, top_n: int = 0, bottom_n: int = 0,
+                         averages: pd.DataFrame = None, previous_averages: pd.DataFrame = None,
+                         intervals: pd.DataFrame = None):
     """
     Calculates the average ESI score for all countries, sorts them, and 
     generates a horizontal bar chart of the full ranking or a selection (Top/Bottom N).
@@ -764,29 +911,37 @@ def plot_esi_ranking_bar(df_merged_scores: pd.DataFrame, top_n: int = 0, bottom_
         df_merged_scores (pd.DataFrame): DataFrame containing yearly 'Economic Success (PCA)' scores.
         top_n (int): Number of top-ranked countries to display. If 0, all countries are included.
         bottom_n (int): Number of bottom-ranked countries to display.
+        averages (pd.DataFrame): Optional precomputed per-country means
+            ['Country Name', 'Economic Success (PCA)'] (e.g. from WindowAggregates); skips the groupby.
+        previous_averages (pd.DataFrame): Optional per-country means of the previous window;
+            adds the rank change to the hover text.
+        intervals (pd.DataFrame): Optional bootstrap output of index_bootstrap.window_intervals();
+            adds confidence intervals as error bars around the plotted averages.
 
     Returns:
         plotly.graph_objects.Figure: The final horizontal bar chart figure.
     """
-    # 1. CALCULATE THE AVERAGE ESI SCORE PER COUNTRY
-    df_ranking = df_merged_scores.groupby('Country Name')['Economic Success (PCA)'].mean().reset_index()
+    # 1. CALCULATE THE AVERAGE ESI SCORE PER COUNTRY (unless precomputed)
+    if averages is None:
+        df_ranking = df_merged_scores.groupby('Country Name')['Economic Success (PCA)'].mean().reset_index()
+    else:
+        df_ranking = averages[['Country Name', 'Economic Success (PCA)']].copy()
 
     # Rename the column
     df_ranking.rename(columns={'Economic Success (PCA)': 'Avg_ESI'}, inplace=True)
 
-    # Sort the ranking from highest ESI to lowest
-    df_ranking_sorted = df_ranking.sort_values(by='Avg_ESI', ascending=False).reset_index(drop=True)
-    
-    # 2. SELECT DATA FOR VISUALIZATION (Handles Top N, Bottom N, or All)
-    if top_n > 0 or bottom_n > 0:
-        df_top = df_ranking_sorted.head(top_n)
-        df_bottom = df_ranking_sorted.tail(bottom_n)
-        # Use concat to combine the selected slices
-        df_bar_viz = pd.concat([df_top, df_bottom])
-    else:
-        # Default: Plot all countries
-        df_bar_viz = df_ranking_sorted
-        
+    if previous_averages is not None:
+        previous_averages = previous_averages.rename(columns={'Economic Success (PCA)': 'Avg_ESI'})
+
+    # 2. RANK + SELECT DATA FOR VISUALIZATION (Top N / Bottom N by partial selection, or all if both 0)
+    df_bar_viz = RankingEngine.from_frame(df_ranking, 'Avg_ESI').rank(
+        'Avg_ESI', top_n=top_n, bottom_n=bottom_n, previous=previous_averages
+    )
+
+    error_bars = {}
+    if intervals is not None:
+        df_bar_viz, error_bars = interval_error_bars(df_bar_viz, intervals, 'Avg_ESI', 'Economic Success (PCA)')
+
     # 3. CREATE THE HORIZONTAL BAR CHART
     fig = px.bar(
         df_bar_viz,
@@ -796,7 +951,9 @@ def plot_esi_ranking_bar(df_merged_scores: pd.DataFrame, top_n: int = 0, bottom_
         color='Avg_ESI',
         color_continuous_scale=px.colors.sequential.Teal,
         title='Country Ranking: Economic Success Index (ESI, 2000-2023 Average)',
-        labels={'Avg_ESI': 'ESI', 'Country Name': ''}
+        labels={'Avg_ESI': 'ESI', 'Country Name': ''},
+        hover_data=[c for c in ('Rank', 'Rank Change') if c in df_bar_viz.columns],
+        **error_bars
     )
 
     # 4. FIX AXIS ORDER
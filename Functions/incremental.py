@@ -0,0 +1,159 @@
+# ----------------------------
+# INCREMENTAL INGESTION
+# ----------------------------
+# Instead of rebuilding Full_country_list.csv from scratch, new data is compared
+# with the stored snapshot on the key (Country Name, Indicator Name, Year).
+# Only new and changed rows are upserted, and the change set is returned so that
+# downstream stages (scores, rankings) can limit what they recompute.
+# Rows missing from the incoming data are kept (append-only).
+# The upserted table is kept in its own snapshot ("indicators_incremental"), not
+# in the snapshot the dataset refreshers revalidate from the remote CSV, so a
+# refresh never overwrites ingested rows.
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from Functions.snapshot import SNAPSHOT_DIR, LONG_SCHEMA, read_snapshot, write_snapshot
+
+
+KEY = ["Country Name", "Indicator Name", "Year"]
+
+# Snapshot of the upserted table, and the refreshed snapshot it starts from
+INCREMENTAL_SNAPSHOT = "indicators_incremental"
+BASE_SNAPSHOT = "indicators"
+
+
+def _label_values(s):
+    return s.cat.categories if isinstance(s.dtype, pd.CategoricalDtype) else pd.unique(s)
+
+
+def _align_keys(stored, incoming):
+    """
+    Casts the label columns of both frames to categoricals with the same
+    categories, so the key join compares integer codes instead of strings.
+    """
+    stored, incoming = stored.copy(), incoming.copy()
+    for col in ["Country Name", "Indicator Name"]:
+        labels = pd.Index(_label_values(stored[col])).append(pd.Index(_label_values(incoming[col])))
+        dtype = pd.CategoricalDtype(labels.unique())
+        stored[col] = stored[col].astype(dtype)
+        incoming[col] = incoming[col].astype(dtype)
+    stored["Year"] = stored["Year"].astype("int64")
+    incoming["Year"] = incoming["Year"].astype("int64")
+    return stored, incoming
+
+
+# ----------------------------
+# Function 1: Delta between stored and incoming table
+# ----------------------------
+def compute_delta(stored, incoming, rtol=1e-9):
+    """
+    Compares incoming rows with the stored table on KEY.
+
+    Returns:
+    - change set dict:
+        "inserted": rows whose key is not stored yet            [KEY + Value]
+        "updated":  rows whose value changed (NaN == NaN)        [KEY + Value + old_value]
+        "unchanged": number of incoming rows that were already stored as-is
+    """
+    stored, incoming = _align_keys(stored[KEY + ["Value"]], incoming[KEY + ["Value"]])
+    incoming = incoming.drop_duplicates(KEY, keep="last")
+
+    merged = incoming.merge(
+        stored.rename(columns={"Value": "old_value"}),
+        on=KEY, how="left", indicator=True
+    )
+    is_new = (merged["_merge"] == "left_only").to_numpy()
+
+    new_values = merged["Value"].to_numpy(dtype=np.float64)
+    old_values = merged["old_value"].to_numpy(dtype=np.float64)
+    same = np.isclose(new_values, old_values, rtol=rtol, atol=0, equal_nan=True)
+    is_updated = ~is_new & ~same
+
+    merged = merged.drop(columns="_merge")
+    return {
+        "inserted": merged.loc[is_new, KEY + ["Value"]].reset_index(drop=True),
+        "updated": merged.loc[is_updated, KEY + ["Value", "old_value"]].reset_index(drop=True),
+        "unchanged": int((~is_new & same).sum()),
+    }
+
+
+# ----------------------------
+# Function 2: Apply a change set
+# ----------------------------
+def apply_delta(stored, changes):
+    """
+    Upserts the change set into the stored table and returns the new table.
+    Unchanged rows keep their position, inserted rows are appended.
+    """
+    if changes["inserted"].empty and changes["updated"].empty:
+        return stored
+
+    table = stored[KEY + ["Value"]]
+    updated = changes["updated"]
+    if not updated.empty:
+        table, updated = _align_keys(table, updated)
+        positions = table.reset_index(drop=True).reset_index().merge(
+            updated[KEY + ["Value"]], on=KEY, how="inner", suffixes=("_old", "")
+        )
+        table = table.reset_index(drop=True)
+        table.loc[positions["index"].to_numpy(), "Value"] = positions["Value"].to_numpy()
+
+    if not changes["inserted"].empty:
+        table, inserted = _align_keys(table, changes["inserted"])
+        table = pd.concat([table, inserted], ignore_index=True)
+
+    return table
+
+
+def affected_keys(changes, level=("Country Name", "Indicator Name")):
+    """
+    Returns the distinct keys touched by a change set at the given level,
+    e.g. the (country, indicator) pairs whose scores need recomputing.
+    """
+    level = list(level)
+    touched = pd.concat([changes["inserted"][level], changes["updated"][level]], ignore_index=True)
+    return touched.drop_duplicates().reset_index(drop=True)
+
+
+# ----------------------------
+# Function 3: Incremental ingestion against the snapshot store
+# ----------------------------
+def ingest_incremental(incoming, name=INCREMENTAL_SNAPSHOT, schema=LONG_SCHEMA, log_changes=True,
+                       base=BASE_SNAPSHOT):
+    """
+    Upserts `incoming` into the snapshot `name` and returns the change set.
+    The first run starts from the snapshot `base` (the refreshed remote table)
+    if there is one, otherwise it inserts everything. `name` must not be a
+    snapshot a DatasetRefresher writes, or the next refresh drops the upserts.
+
+    With log_changes=True each non-empty change set is also written to
+    data_cache/changes/<name>-<timestamp>.parquet for downstream stages.
+    """
+    if name == base:
+        raise ValueError(f"ingest into a separate snapshot, not the refreshed {base!r} one")
+    stored = read_snapshot(name)
+    if stored is None and base is not None:
+        stored = read_snapshot(base)
+    if stored is None:
+        stored = incoming.iloc[0:0][KEY + ["Value"]]
+
+    changes = compute_delta(stored, incoming)
+    if changes["inserted"].empty and changes["updated"].empty:
+        return changes
+
+    write_snapshot(apply_delta(stored, changes), name, schema, meta={"source": "incremental"})
+
+    if log_changes:
+        log = pd.concat([
+            changes["inserted"].assign(change="insert"),
+            changes["updated"].drop(columns="old_value").assign(change="update"),
+        ], ignore_index=True)
+        log_dir = os.path.join(SNAPSHOT_DIR, "changes")
+        os.makedirs(log_dir, exist_ok=True)
+        log.to_parquet(os.path.join(log_dir, f"{name}-{time.time_ns()}.parquet"), index=False)
+
+    return changes
@@ -0,0 +1,232 @@
+# ----------------------------
+# INDEX BOOTSTRAP
+# ----------------------------
+# Confidence intervals for the EI / WBI scores. A replicate resamples the
+# country-years with replacement and refits every index on the resample. The
+# resample is drawn as multinomial row weights, so a whole chunk of replicates
+# is a (replicates x rows) weight matrix: weighted moments are einsums and the
+# k x k correlation matrices of the chunk go through one batched eigh. Chunks
+# are spread over a process pool. The refitted scores of the original rows
+# give per-country-year bands, and their window averages give the
+# quadrant-membership probabilities shown by plot_esi_wti_quadrants().
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from Functions.index_engine import EXCLUDED_COUNTRIES, INDEX_DEFINITIONS, decompose, index_matrix, standardize
+from Functions.interning import COUNTRIES
+
+# Replicates per task; fixed so results depend on the seed only, not on the workers
+CHUNK_SIZE = 250
+
+# Quadrant label -> (sign of average EI, sign of average WBI), as in plot_esi_wti_quadrants()
+QUADRANTS = {
+    "High ESI, High WTI": (1, 1),
+    "Low ESI, High WTI": (-1, 1),
+    "Low ESI, Low WTI": (-1, -1),
+    "High ESI, Low WTI": (1, -1),
+}
+
+
+@dataclass
+class BootstrapResult:
+    """
+    Output of bootstrap_indices().
+
+    - scores: point estimates, DataFrame ['Country Name', 'Year', score columns]
+      (rows of compute_indices())
+    - replicates: {score_column: (replicates x rows) array}, NaN where the index
+      has no row
+    - level: confidence level of the bands
+    """
+    scores: pd.DataFrame
+    replicates: dict
+    level: float
+
+
+# ----------------------------
+# Function 1: Batched replicates
+# ----------------------------
+def fit_replicates(Z, weights, reference):
+    """
+    PC1 scores of the rows of Z under each weighted refit.
+
+    Parameters:
+    - Z: (rows x k) standardized, sign-recoded indicators of the full sample
+    - weights: (replicates x rows) resampling counts
+    - reference: full-sample PC1, used to orient every replicate
+
+    Returns:
+    - (replicates x rows) scores, each standardized with its replicate's moments
+    """
+    n = np.maximum(weights.sum(axis=1), 1)
+    mean = (weights @ Z) / n[:, None]
+    covariance = np.einsum("br,ri,rj->bij", weights, Z, Z) / n[:, None, None] \
+        - mean[:, :, None] * mean[:, None, :]
+    scale = np.sqrt(np.clip(np.diagonal(covariance, axis1=1, axis2=2), 0, None))
+    scale = np.where(scale > 0, scale, 1.0)
+    _, eigenvectors = np.linalg.eigh(covariance / (scale[:, :, None] * scale[:, None, :]))
+    pc1 = eigenvectors[:, :, -1]
+    # Same direction as the point estimate, so "higher = better" holds in every replicate
+    pc1 *= np.where(pc1 @ reference < 0, -1.0, 1.0)[:, None]
+    loadings = pc1 / scale
+    return loadings @ Z.T - (mean * loadings).sum(axis=1)[:, None]
+
+
+def _run_chunk(task):
+    """
+    One pool task: draws `count` resamples of the country-year keys and refits
+    every index on them. Module-level so it can be pickled.
+    """
+    seed, count, n_keys, indices = task
+    rng = np.random.default_rng(seed)
+    key_weights = rng.multinomial(n_keys, np.full(n_keys, 1.0 / n_keys), size=count).astype(np.float64)
+    return [fit_replicates(Z, key_weights[:, rows], reference) for Z, rows, reference in indices]
+
+
+# ----------------------------
+# Function 2: Bootstrap
+# ----------------------------
+def bootstrap_indices(df, indices=("EI", "WBI"), replicates=1000, level=0.9, seed=0, workers=None,
+                      year_range=None, exclude=EXCLUDED_COUNTRIES):
+    """
+    Bootstraps the indices over country-years.
+
+    Parameters:
+    - indices: names in INDEX_DEFINITIONS (or definition dicts); resampled
+      jointly, so a drawn country-year counts for every index that has it
+    - replicates: number of bootstrap replicates
+    - level: confidence level of the bands (e.g. 0.9 -> 5th / 95th percentiles)
+    - seed: reproducible for a given seed, whatever the number of workers
+    - workers: processes (default: CPU count, at most one per chunk); 1 runs inline
+
+    Returns:
+    - BootstrapResult
+    """
+    # Point estimates (as compute_index()) and the standardized matrices to resample
+    point, standardized = [], []
+    for index in indices:
+        definition = INDEX_DEFINITIONS[index] if isinstance(index, str) else index
+        indicators = list(definition["indicators"])
+        signs = np.array([definition["indicators"][i] for i in indicators], dtype=np.float64)
+        keys, X = index_matrix(df, indicators, year_range, exclude)
+        Z, _, _ = standardize(X * signs)
+        components, index_scores, _ = decompose(Z)
+        point.append(keys.assign(**{definition["score_column"]: index_scores[:, 0]}))
+        standardized.append((Z, components[0]))
+
+    # Output rows: those of the first index, the others left-merged (as compute_indices())
+    scores = point[0]
+    for index_scores in point[1:]:
+        scores = scores.merge(index_scores, on=["Country Name", "Year"], how="left")
+
+    # Resampling units: every country-year any index has
+    all_keys = pd.MultiIndex.from_frame(
+        pd.concat([p[["Country Name", "Year"]] for p in point]).drop_duplicates())
+    payload = [
+        (Z, all_keys.get_indexer(pd.MultiIndex.from_frame(p[["Country Name", "Year"]])), reference)
+        for (Z, reference), p in zip(standardized, point)
+    ]
+
+    counts = [CHUNK_SIZE] * (replicates // CHUNK_SIZE) + ([replicates % CHUNK_SIZE] if replicates % CHUNK_SIZE else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    tasks = [(s, c, len(all_keys), payload) for s, c in zip(seeds, counts)]
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        chunks = [_run_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_run_chunk, tasks))
+
+    # Replicate scores of each index, placed on the output rows
+    output_keys = pd.MultiIndex.from_frame(scores[["Country Name", "Year"]])
+    replicates = {}
+    for k, index_scores in enumerate(point):
+        draws = np.concatenate([chunk[k] for chunk in chunks])
+        positions = pd.MultiIndex.from_frame(index_scores[["Country Name", "Year"]]).get_indexer(output_keys)
+        placed = np.full((len(draws), len(scores)), np.nan)
+        placed[:, positions >= 0] = draws[:, positions[positions >= 0]]
+        replicates[index_scores.columns[-1]] = placed
+
+    return BootstrapResult(scores=scores, replicates=replicates, level=level)
+
+
+# ----------------------------
+# Function 3: Bands + quadrant probabilities
+# ----------------------------
+def _bounds(level):
+    return 50 * (1 - level), 50 * (1 + level)
+
+
+def score_bands(result):
+    """
+    Per country-year bands: DataFrame ['Country Name', 'Year'] + for each score
+    column: point estimate, '<column> low', '<column> high'.
+    """
+    low, high = _bounds(result.level)
+    bands = result.scores.copy()
+    for column, draws in result.replicates.items():
+        with np.errstate(all="ignore"):
+            bands[f"{column} low"] = np.nanpercentile(draws, low, axis=0)
+            bands[f"{column} high"] = np.nanpercentile(draws, high, axis=0)
+    return bands
+
+
+def window_intervals(result, year_range=None, countries=None,
+                     x_column="Economic Success (PCA)", y_column="Well-Being (PCA)"):
+    """
+    Per-country averages over a year window with bootstrap intervals and
+    quadrant-membership probabilities - the `intervals` argument of
+    plot_esi_wti_quadrants() / plot_esi_ranking_bar().
+
+    Returns:
+    - DataFrame ['Country Name', x_column, y_column, '<column> low', '<column> high',
+      'P(<quadrant>)' for each of QUADRANTS, 'Quadrant probability' (of the
+      quadrant of the point estimate)]
+    """
+    keys = result.scores
+    mask = np.ones(len(keys), dtype=bool)
+    if year_range is not None:
+        year_min, year_max = year_range
+        if year_min is not None:
+            mask &= keys["Year"].to_numpy() >= year_min
+        if year_max is not None:
+            mask &= keys["Year"].to_numpy() <= year_max
+    if countries is not None:
+        wanted = {COUNTRIES.canonical(c) for c in countries}
+        mask &= keys["Country Name"].map(COUNTRIES.canonical).isin(wanted).to_numpy()
+
+    codes, labels = pd.factorize(keys["Country Name"][mask].astype(object))
+    membership = np.zeros((len(labels), mask.sum()))
+    membership[codes, np.arange(mask.sum())] = 1.0
+
+    def window_means(values):
+        # (..., rows) -> (..., countries), skipping NaN like groupby().mean()
+        present = ~np.isnan(values)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (np.where(present, values, 0) @ membership.T) / (present @ membership.T)
+
+    low, high = _bounds(result.level)
+    intervals = pd.DataFrame({"Country Name": labels})
+    averages = {}
+    for column in (x_column, y_column):
+        intervals[column] = window_means(keys[column].to_numpy(dtype=np.float64)[mask])
+        averages[column] = window_means(result.replicates[column][:, mask])
+        with np.errstate(all="ignore"):
+            intervals[f"{column} low"] = np.nanpercentile(averages[column], low, axis=0)
+            intervals[f"{column} high"] = np.nanpercentile(averages[column], high, axis=0)
+
+    x_sign, y_sign = np.sign(averages[x_column]), np.sign(averages[y_column])
+    point = np.sign(intervals[[x_column, y_column]].to_numpy())
+    intervals["Quadrant probability"] = np.nan
+    for quadrant, (sx, sy) in QUADRANTS.items():
+        probability = ((x_sign == sx) & (y_sign == sy)).mean(axis=0)
+        intervals[f"P({quadrant})"] = probability
+        is_point = (point[:, 0] == sx) & (point[:, 1] == sy)
+        intervals.loc[is_point, "Quadrant probability"] = probability[is_point]
+    return intervals
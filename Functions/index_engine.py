@@ -0,0 +1,233 @@
+# ----------------------------
+# INDEX ENGINE
+# ----------------------------
+# Importable version of the PCA cells of Creating_Econ_Well_Being_Indicators.ipynb
+# / Max.ipynb: long table -> country-year x indicator matrix -> ffill/bfill per
+# country -> sign recode -> z-scores -> PCA, with NumPy only (SVD of the
+# standardized matrix, no scikit-learn). PC1 is the index.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from Functions.indexing import resolve_year_range
+from Functions.interning import COUNTRIES, INDICATORS, intern_labels
+from Functions.panel import PanelCube
+
+
+# Index name -> output column and {indicator: sign} (-1 = "bad" indicator, recoded)
+INDEX_DEFINITIONS = {
+    "EI": {
+        "score_column": "Economic Success (PCA)",
+        "indicators": {
+            "GDP per capita": 1,
+            "Unemployment levels (%)": -1,
+            "Inflation (CPI, %)": -1,
+        },
+    },
+    "WBI": {
+        "score_column": "Well-Being (PCA)",
+        "indicators": {
+            "Life expectancy at birth, total (years)": 1,
+            "Gini index": -1,
+        },
+    },
+}
+
+# Dropped in the notebooks (incomplete series)
+EXCLUDED_COUNTRIES = ("China", "Cote d'Ivoire", "Ghana")
+
+
+@dataclass
+class IndexResult:
+    """
+    Output of compute_index().
+
+    - scores: DataFrame ['Country Name', 'Year', score_column]
+    - loadings: DataFrame (components x indicators); row 0 holds the index weights
+    - explained_variance_ratio: share of variance per component
+    - mean, scale: standardization parameters of the recoded indicators
+    """
+    name: str
+    scores: pd.DataFrame
+    loadings: pd.DataFrame
+    explained_variance_ratio: np.ndarray
+    mean: pd.Series
+    scale: pd.Series
+
+
+# ----------------------------
+# Function 1: Country-year matrix
+# ----------------------------
+def fill_within_country(values):
+    """
+    Forward- then back-fills NaNs along the year axis (axis 1) of a
+    (country, year, ...) array, never across countries.
+    """
+    filled = values
+    for reverse in (False, True):
+        v = filled[:, ::-1] if reverse else filled
+        n_years = v.shape[1]
+        shape = (1, n_years) + (1,) * (v.ndim - 2)
+        index = np.where(np.isnan(v), 0, np.arange(n_years).reshape(shape))
+        np.maximum.accumulate(index, axis=1, out=index)
+        v = np.take_along_axis(v, index, axis=1)
+        filled = v[:, ::-1] if reverse else v
+    return filled
+
+
+def filled_block(df, indicators, year_range=None, exclude=EXCLUDED_COUNTRIES):
+    """
+    Dense (country, year, indicator) values of the window, filled per country.
+
+    Returns:
+    - countries: canonical labels
+    - years: int array
+    - present: (country, year) bool - rows of the notebook's pivot (any indicator
+      has a value that year)
+    - values: (country, year, indicator) float array, NaN where still missing
+    """
+    year_min, year_max = resolve_year_range(year_range)
+    cube = PanelCube.from_long(df)
+    excluded = {COUNTRIES.canonical(c) for c in exclude}
+    countries = [c for c in cube.countries if COUNTRIES.canonical(c) not in excluded]
+    indicator_labels = {INDICATORS.canonical(i): i for i in cube.indicators}
+
+    # (country, indicator, year) block of every indicator: defines which rows exist
+    c_labels, i_all, years, block = cube.block(countries, list(cube.indicators), year_min, year_max)
+    present = ~np.isnan(block).all(axis=1)
+
+    wanted = [indicator_labels.get(INDICATORS.canonical(i)) for i in indicators]
+    missing = [i for i, label in zip(indicators, wanted) if label is None]
+    if missing:
+        raise KeyError(f"indicators not in the data: {missing}")
+    positions = [i_all.index(label) for label in wanted]
+
+    values = fill_within_country(np.transpose(block[:, positions, :], (0, 2, 1)))
+    return [COUNTRIES.canonical(c) for c in c_labels], years, present, values
+
+
+def index_matrix(df, indicators, year_range=None, exclude=EXCLUDED_COUNTRIES):
+    """
+    Country-year x indicator matrix for the index, like the notebook's
+    pivot_table + groupby(country).ffill().bfill().
+
+    Rows are the country-years with any indicator value in the year range
+    (duplicates averaged); rows still incomplete after filling are dropped.
+
+    Returns:
+    - keys: DataFrame ['Country Name', 'Year'] (canonical labels)
+    - X: float array (rows x len(indicators))
+    """
+    countries, years, present, values = filled_block(df, indicators, year_range, exclude)
+    keep = present & ~np.isnan(values).any(axis=2)
+    c_idx, y_idx = np.nonzero(keep)
+
+    keys = pd.DataFrame({
+        "Country Name": np.asarray(countries, dtype=object)[c_idx],
+        "Year": years[y_idx],
+    })
+    return keys, values[c_idx, y_idx]
+
+
+# ----------------------------
+# Function 2: Standardize + decompose
+# ----------------------------
+def standardize(X):
+    """
+    z-scores per column (population std, like StandardScaler).
+    Returns (Z, mean, scale); constant columns get scale 1.
+    """
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale = np.where(scale > 0, scale, 1.0)
+    return (X - mean) / scale, mean, scale
+
+
+def orient_components(components):
+    """
+    Flips each component so its loadings sum to a positive number: after the
+    sign recode, a higher index then always means a better outcome.
+    Works on (..., components, indicators) arrays; returns the signs applied.
+    """
+    return np.where(components.sum(axis=-1, keepdims=True) < 0, -1.0, 1.0)
+
+
+def decompose(Z):
+    """
+    PCA of a centred matrix via SVD.
+
+    Returns:
+    - components: (k x indicators) loadings, oriented with orient_components()
+    - scores: (rows x k) projections (Z @ components.T)
+    - explained_variance_ratio: (k,)
+    """
+    _, s, vt = np.linalg.svd(Z, full_matrices=False)
+    vt = vt * orient_components(vt)
+    variance = s ** 2
+    total = variance.sum()
+    ratio = variance / total if total > 0 else np.zeros_like(variance)
+    return vt, Z @ vt.T, ratio
+
+
+# ----------------------------
+# Function 3: Indices
+# ----------------------------
+def compute_index(df, index="EI", year_range=None, exclude=EXCLUDED_COUNTRIES):
+    """
+    Computes one index from the long table.
+
+    Parameters:
+    - index: name in INDEX_DEFINITIONS or a definition dict
+      {"score_column": ..., "indicators": {indicator: sign}}
+    - year_range: (min, max), default YEAR_RANGE
+
+    Returns:
+    - IndexResult
+    """
+    definition = INDEX_DEFINITIONS[index] if isinstance(index, str) else index
+    name = index if isinstance(index, str) else definition["score_column"]
+    indicators = list(definition["indicators"])
+    signs = np.array([definition["indicators"][i] for i in indicators], dtype=np.float64)
+
+    keys, X = index_matrix(df, indicators, year_range, exclude)
+    Z, mean, scale = standardize(X * signs)
+    components, scores, ratio = decompose(Z)
+
+    scores_df = keys.assign(**{definition["score_column"]: scores[:, 0]})
+    return IndexResult(
+        name=name,
+        scores=scores_df,
+        loadings=pd.DataFrame(components, columns=indicators,
+                              index=[f"PC{k + 1}" for k in range(len(components))]),
+        explained_variance_ratio=ratio,
+        mean=pd.Series(mean, index=indicators),
+        scale=pd.Series(scale, index=indicators),
+    )
+
+
+def compute_indices(df, year_range=None, exclude=EXCLUDED_COUNTRIES):
+    """
+    EI and WBI merged per country-year (EI rows kept, like the notebook's left
+    merge) - the layout of df_merged_scores.
+
+    Returns:
+    - (merged scores DataFrame, {"EI": IndexResult, "WBI": IndexResult})
+    """
+    results = {name: compute_index(df, name, year_range, exclude) for name in INDEX_DEFINITIONS}
+    merged = results["EI"].scores.merge(results["WBI"].scores, on=["Country Name", "Year"], how="left")
+    return merged, results
+
+
+def index_scores_table(df):
+    """
+    compute_indices() in the layout of the overview sheet
+    ['Country Name', 'Year', 'score_pca_economics', 'score_pca_wellbeing'] -
+    transform of the "index_scores" dataset (Functions/registry.py).
+    """
+    merged, _ = compute_indices(df)
+    return intern_labels(merged.rename(columns={
+        "Economic Success (PCA)": "score_pca_economics",
+        "Well-Being (PCA)": "score_pca_wellbeing",
+    }))
@@ -0,0 +1,248 @@
+# ----------------------------
+# INCREMENTAL INDEX
+# ----------------------------
+# Keeps the sufficient statistics of an index - row count, column sums and the
+# cross-product matrix of the sign-recoded indicators - so a data release
+# only re-processes the countries it touches: the release's change set is
+# applied to the stored long rows of those countries, their old country-year
+# rows are subtracted, their new rows added, and the PCA is re-derived from the
+# k x k correlation matrix (k = number of indicators). Same result as a full
+# compute_index() refit, without refitting or scanning the full table.
+
+import numpy as np
+import pandas as pd
+
+from Functions.incremental import KEY
+from Functions.index_engine import (
+    EXCLUDED_COUNTRIES, INDEX_DEFINITIONS, compute_index, index_matrix, orient_components
+)
+from Functions.indexing import resolve_year_range
+from Functions.interning import COUNTRIES, VOCABULARIES, key_mask
+
+
+class IncrementalIndex:
+    """
+    Running statistics of one index (see INDEX_DEFINITIONS).
+
+    Attributes:
+    - source: {country: long rows (KEY + Value) in the year range} the rows are built from
+    - rows: {country: (years, X)} current recoded rows per country
+    - n, sums, cross: row count, column sums, cross products (shifted by `shift`)
+    """
+
+    def __init__(self, index="EI", year_range=None, exclude=EXCLUDED_COUNTRIES):
+        self.definition = INDEX_DEFINITIONS[index] if isinstance(index, str) else index
+        self.indicators = list(self.definition["indicators"])
+        self.signs = np.array([self.definition["indicators"][i] for i in self.indicators], dtype=np.float64)
+        self.year_range = resolve_year_range(year_range)
+        self.exclude = exclude
+
+        k = len(self.indicators)
+        self.source = {}
+        self.rows = {}
+        self.n = 0
+        self.sums = np.zeros(k)
+        self.cross = np.zeros((k, k))
+        # Sums are kept around a fixed shift (the first batch's mean) to limit cancellation
+        self.shift = None
+
+    # ----------------------------
+    # Statistics
+    # ----------------------------
+    def _add(self, X, weight):
+        if self.shift is None:
+            self.shift = X.mean(axis=0) if len(X) else np.zeros(len(self.indicators))
+        D = X - self.shift
+        self.n += weight * len(X)
+        self.sums += weight * D.sum(axis=0)
+        self.cross += weight * (D.T @ D)
+
+    def _country_rows(self, df):
+        """
+        {country: (years, recoded X)} for the countries in df.
+        """
+        if len(df) == 0:
+            return {}
+        keys, X = index_matrix(df, self.indicators, self.year_range, self.exclude)
+        X = X * self.signs
+        result = {}
+        codes, labels = pd.factorize(keys["Country Name"])
+        years = keys["Year"].to_numpy()
+        for c, label in enumerate(labels):
+            rows = codes == c
+            result[label] = (years[rows], X[rows])
+        return result
+
+    def _by_country(self, df):
+        """
+        {canonical country: long rows (KEY + Value, canonical labels) in the year range}.
+        """
+        df = df[KEY + ["Value"]]
+        year_min, year_max = self.year_range
+        years = df["Year"].to_numpy()
+        in_range = np.ones(len(df), dtype=bool)
+        if year_min is not None:
+            in_range &= years >= year_min
+        if year_max is not None:
+            in_range &= years <= year_max
+        df = df[in_range]
+        frame = {column: df[column].to_numpy() for column in ("Year", "Value")}
+        for column, vocabulary in VOCABULARIES.items():
+            codes, uniques = pd.factorize(df[column].astype(object))
+            frame[column] = np.array([vocabulary.canonical(u) for u in uniques], dtype=object)[codes]
+        df = pd.DataFrame(frame)[KEY + ["Value"]]
+        return {country: rows.reset_index(drop=True) for country, rows in df.groupby("Country Name", sort=False)}
+
+    def fit(self, df):
+        """
+        Builds the statistics from the whole long table.
+        """
+        self.__init__(self.definition, self.year_range, self.exclude)
+        self.source = self._by_country(df)
+        self.rows = self._country_rows(df)
+        if self.rows:
+            self._add(np.concatenate([X for _, X in self.rows.values()]), 1)
+        return self
+
+    def update(self, df=None, changes=None, countries=None):
+        """
+        Re-processes the countries touched by a release.
+
+        Parameters:
+        - changes: change set from compute_delta(); it is applied to the stored
+          rows of its countries, so only the delta is read (df is not needed)
+        - df, countries: alternatively, re-read the given countries from the
+          long table after the release (e.g. apply_delta(...))
+
+        The cost is proportional to the change plus the touched countries'
+        history (the k x k decomposition is constant).
+        """
+        if changes is not None:
+            delta = pd.concat([changes["inserted"][KEY + ["Value"]], changes["updated"][KEY + ["Value"]]],
+                              ignore_index=True)
+            fresh = self._by_country(delta)
+            for country, rows in fresh.items():
+                self.source[country] = _upsert(self.source.get(country), rows)
+            countries = list(fresh)
+        elif countries is not None:
+            if df is None:
+                raise ValueError("update(countries=...) needs the long table df")
+            countries = sorted({COUNTRIES.canonical(c) for c in countries})
+            self.source.update(self._by_country(df[key_mask(df, countries)]))
+        else:
+            raise ValueError("update() needs a change set or a list of countries")
+        if not countries:
+            return self
+
+        for country in countries:
+            old = self.rows.pop(country, None)
+            if old is not None:
+                self._add(old[1], -1)
+
+        # Fill and row selection happen per country, so only their history is needed
+        history = [self.source[c] for c in countries if c in self.source]
+        new_rows = self._country_rows(pd.concat(history, ignore_index=True)) if history else {}
+        for country, (years, X) in new_rows.items():
+            self._add(X, 1)
+            self.rows[country] = (years, X)
+        return self
+
+    # ----------------------------
+    # Decomposition
+    # ----------------------------
+    def _covariance(self):
+        mean_shifted = self.sums / self.n
+        return mean_shifted, self.cross / self.n - np.outer(mean_shifted, mean_shifted)
+
+    def moments(self):
+        """
+        Returns (mean, scale) of the recoded indicators (population std).
+        """
+        mean_shifted, covariance = self._covariance()
+        scale = np.sqrt(np.clip(np.diag(covariance), 0, None))
+        return self.shift + mean_shifted, np.where(scale > 0, scale, 1.0)
+
+    def decompose(self):
+        """
+        PCA from the correlation matrix.
+
+        Returns:
+        - components: (k x indicators), oriented like index_engine.decompose()
+        - explained_variance_ratio: (k,)
+        """
+        _, covariance = self._covariance()
+        _, scale = self.moments()
+        correlation = covariance / np.outer(scale, scale)
+        eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+        order = np.argsort(eigenvalues)[::-1]
+        components = eigenvectors[:, order].T
+        components = components * orient_components(components)
+        eigenvalues = np.clip(eigenvalues[order], 0, None)
+        total = eigenvalues.sum()
+        return components, eigenvalues / total if total > 0 else eigenvalues
+
+    def scores(self):
+        """
+        Index scores of every current row, DataFrame ['Country Name', 'Year', score_column].
+        (Projecting the rows is O(rows); the statistics update itself is not.)
+        """
+        components, _ = self.decompose()
+        mean, scale = self.moments()
+        countries = sorted(self.rows, key=COUNTRIES.id)
+        frames = []
+        for country in countries:
+            years, X = self.rows[country]
+            frames.append(pd.DataFrame({
+                "Country Name": country,
+                "Year": years,
+                self.definition["score_column"]: ((X - mean) / scale) @ components[0],
+            }))
+        if not frames:
+            return pd.DataFrame(columns=["Country Name", "Year", self.definition["score_column"]])
+        return pd.concat(frames, ignore_index=True)
+
+    def loadings(self):
+        components, _ = self.decompose()
+        return pd.DataFrame(components, columns=self.indicators,
+                            index=[f"PC{k + 1}" for k in range(len(components))])
+
+
+def _upsert(stored, delta):
+    """
+    Applies delta rows (canonical labels) to the stored rows of one country, like
+    apply_delta(): matching keys take the new value, new keys are appended.
+    """
+    delta = delta.drop_duplicates(KEY, keep="last")
+    if stored is None or stored.empty:
+        return delta.reset_index(drop=True)
+    merged = stored.merge(delta, on=KEY, how="left", suffixes=("", "_new"), indicator=True)
+    matched = (merged["_merge"] == "both").to_numpy()
+    merged.loc[matched, "Value"] = merged.loc[matched, "Value_new"]
+    inserted = delta.merge(stored[KEY].drop_duplicates(), on=KEY, how="left", indicator=True)
+    inserted = inserted[inserted["_merge"] == "left_only"]
+    return pd.concat([merged[KEY + ["Value"]], inserted[KEY + ["Value"]]], ignore_index=True)
+
+
+# ----------------------------
+# Check against a full refit
+# ----------------------------
+def compare_with_refit(incremental, df):
+    """
+    Largest absolute differences between the incremental state and
+    compute_index() refitted on df (the same long table).
+
+    Returns:
+    - dict ['loadings', 'explained_variance_ratio', 'scores', 'rows_missing']
+    """
+    full = compute_index(df, incremental.definition, incremental.year_range, incremental.exclude)
+    components, ratio = incremental.decompose()
+    column = incremental.definition["score_column"]
+    merged = full.scores.merge(incremental.scores(), on=["Country Name", "Year"], how="outer",
+                               suffixes=("_full", "_incremental"))
+    difference = (merged[f"{column}_full"] - merged[f"{column}_incremental"]).abs()
+    return {
+        "loadings": float(np.abs(components - full.loadings.to_numpy()).max()),
+        "explained_variance_ratio": float(np.abs(ratio - full.explained_variance_ratio).max()),
+        "scores": float(difference.max()),
+        "rows_missing": int(difference.isna().sum()),
+    }
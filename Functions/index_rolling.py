@@ -0,0 +1,139 @@
+# ----------------------------
+# ROLLING INDEX
+# ----------------------------
+# Index weights per year window (e.g. 10-year windows stepped yearly, or
+# expanding windows) instead of one pooled 2000-2023 PCA. The row count, sums
+# and cross products of the recoded indicators are computed once per year and
+# accumulated into prefix sums, so the statistics of any window are one
+# subtraction (P[end] - P[start]) however much the windows overlap; the k x k
+# correlation matrices of all windows are then decomposed with one batched eigh.
+
+import numpy as np
+import pandas as pd
+
+from Functions.index_engine import EXCLUDED_COUNTRIES, INDEX_DEFINITIONS, index_matrix, orient_components
+
+
+# ----------------------------
+# Function 1: Windows
+# ----------------------------
+def year_windows(years, width=10, step=1, expanding=False):
+    """
+    (start, end) year pairs, both inclusive.
+
+    Parameters:
+    - years: sorted distinct years of the data
+    - width: window length in years (the first window's length if expanding)
+    - step: years between consecutive window ends
+    - expanding: windows all start at the first year
+    """
+    if width < 1 or step < 1:
+        raise ValueError(f"width and step must be >= 1, got {width}, {step}")
+    first, last = int(years[0]), int(years[-1])
+    ends = range(first + width - 1, last + 1, step)
+    return [(first if expanding else end - width + 1, end) for end in ends]
+
+
+def align_signs(components):
+    """
+    Signs that keep consecutive windows' loadings pointing the same way: the
+    first window keeps the orient_components() convention, every later one is
+    flipped if it points away from the (aligned) window before it.
+    Works on (windows, indicators); returns the signs applied.
+    """
+    signs = orient_components(components[:1])[:, 0].tolist() if len(components) else []
+    for w in range(1, len(components)):
+        signs.append(-1.0 if (components[w] @ components[w - 1]) * signs[-1] < 0 else 1.0)
+    return np.asarray(signs)
+
+
+# ----------------------------
+# Function 2: Rolling PCA
+# ----------------------------
+def rolling_index(df, index="EI", width=10, step=1, expanding=False, year_range=None,
+                  exclude=EXCLUDED_COUNTRIES):
+    """
+    PC1 of an index refitted on every year window.
+
+    Parameters:
+    - index: name in INDEX_DEFINITIONS or a definition dict
+    - width, step, expanding: see year_windows()
+    - year_range: (min, max) of the rows, default YEAR_RANGE; gaps are filled per
+      country over the whole range, as in compute_index()
+
+    Returns:
+    - scores: DataFrame ['window_start', 'window_end', 'Country Name', 'Year', score_column]
+      (every row of each window, standardized with that window's moments)
+    - loadings: DataFrame ['window_start', 'window_end', 'rows', 'explained_variance_ratio',
+      *indicators] (PC1 per window, signs aligned across windows)
+    """
+    definition = INDEX_DEFINITIONS[index] if isinstance(index, str) else index
+    indicators = list(definition["indicators"])
+    signs = np.array([definition["indicators"][i] for i in indicators], dtype=np.float64)
+    column = definition["score_column"]
+
+    keys, X = index_matrix(df, indicators, year_range, exclude)
+    X = X * signs
+    if len(X) == 0:
+        raise ValueError("no complete country-year rows in the year range")
+    # Centre on the pooled mean to limit cancellation in the cross products
+    D = X - X.mean(axis=0)
+
+    # Per-year statistics -> prefix sums over the full year axis
+    row_years = keys["Year"].to_numpy()
+    first = int(row_years.min())
+    years = np.arange(first, int(row_years.max()) + 1)
+    position = row_years - first
+    k = len(indicators)
+    n = np.bincount(position, minlength=len(years)).astype(np.float64)
+    sums = np.zeros((len(years), k))
+    np.add.at(sums, position, D)
+    cross = np.zeros((len(years), k, k))
+    np.add.at(cross, position, D[:, :, None] * D[:, None, :])
+    prefix = [np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(a, axis=0)]) for a in (n, sums, cross)]
+
+    windows = year_windows(years, width, step, expanding)
+    if not windows:
+        raise ValueError(f"the data spans {len(years)} years, fewer than width={width}")
+    starts = np.array([s for s, _ in windows]) - first
+    ends = np.array([e for _, e in windows]) - first + 1
+    n_w, sums_w, cross_w = (p[ends] - p[starts] for p in prefix)
+    if (n_w < 2).any():
+        raise ValueError("every window needs at least two complete rows")
+
+    # Batched correlation + eigh over the (windows x k x k) stack
+    mean_w = sums_w / n_w[:, None]
+    covariance = cross_w / n_w[:, None, None] - mean_w[:, :, None] * mean_w[:, None, :]
+    scale = np.sqrt(np.clip(np.diagonal(covariance, axis1=1, axis2=2), 0, None))
+    scale = np.where(scale > 0, scale, 1.0)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance / (scale[:, :, None] * scale[:, None, :]))
+    pc1 = eigenvectors[:, :, -1]
+    pc1 *= align_signs(pc1)[:, None]
+    eigenvalues = np.clip(eigenvalues, 0, None)
+    ratio = eigenvalues[:, -1] / np.where(eigenvalues.sum(axis=1) > 0, eigenvalues.sum(axis=1), 1)
+
+    # Scores of all windows at once: ((D - mean_w) / scale_w) @ pc1_w
+    weights = pc1 / scale
+    score = D @ weights.T - (mean_w * weights).sum(axis=1)
+    in_window = (position[:, None] >= starts) & (position[:, None] < ends)
+    r_idx, w_idx = np.nonzero(in_window)
+    order = np.lexsort((r_idx, w_idx))
+    r_idx, w_idx = r_idx[order], w_idx[order]
+
+    window_start, window_end = starts + first, ends + first - 1
+    scores = pd.DataFrame({
+        "window_start": window_start[w_idx],
+        "window_end": window_end[w_idx],
+        "Country Name": keys["Country Name"].to_numpy()[r_idx],
+        "Year": row_years[r_idx],
+        column: score[r_idx, w_idx],
+    })
+    loadings = pd.DataFrame({
+        "window_start": window_start,
+        "window_end": window_end,
+        "rows": n_w.astype(int),
+        "explained_variance_ratio": ratio,
+    })
+    for i, indicator in enumerate(indicators):
+        loadings[indicator] = pc1[:, i]
+    return scores, loadings
@@ -0,0 +1,137 @@
+# ----------------------------
+# INDEX VARIANTS
+# ----------------------------
+# Evaluates many index definitions (indicator subsets + sign conventions) at
+# once instead of one notebook copy per variant. The filled country-year block
+# of the union of all indicators is built once; every variant is then a row
+# mask plus a sign vector over that block, so the means, scales and
+# correlation matrices of all variants come out of a few einsums and one
+# batched np.linalg.eigh over a (variants x k x k) stack.
+
+import numpy as np
+import pandas as pd
+
+from Functions.index_engine import EXCLUDED_COUNTRIES, INDEX_DEFINITIONS, filled_block, orient_components
+
+# Variants the notebooks keep switching between ({indicator: sign}, -1 = recoded)
+DEFAULT_VARIANTS = {
+    "EI": INDEX_DEFINITIONS["EI"]["indicators"],
+    "EI+savings": {**INDEX_DEFINITIONS["EI"]["indicators"], "National savings (% GDP)": 1},
+    "WBI": INDEX_DEFINITIONS["WBI"]["indicators"],
+    # WTI_indicators of the notebooks
+    "WBI+birth_rate": {**INDEX_DEFINITIONS["WBI"]["indicators"], "Birth rate, crude (per 1,000 people)": -1},
+    "WBI+poverty+health": {
+        **INDEX_DEFINITIONS["WBI"]["indicators"],
+        "Poverty headcount ratio at national poverty lines (% of population)": -1,
+        "Current health expenditure (% of GDP)": 1,
+    },
+}
+
+
+# ----------------------------
+# Function 1: Variant specs
+# ----------------------------
+def variant_matrix(variants):
+    """
+    Sign matrix of the variants over the union of their indicators.
+
+    Parameters:
+    - variants: {variant_id: {indicator: sign}} or a list of {indicator: sign}
+      (IDs "V1", "V2", ...)
+
+    Returns:
+    - ids: variant IDs
+    - indicators: union of the indicators, in first-seen order
+    - signs: (variants x indicators) array, 0 where a variant does not use the indicator
+    """
+    if not isinstance(variants, dict):
+        variants = {f"V{k + 1}": spec for k, spec in enumerate(variants)}
+    ids = list(variants)
+    indicators = list(dict.fromkeys(i for spec in variants.values() for i in spec))
+    signs = np.zeros((len(ids), len(indicators)))
+    for v, spec in enumerate(variants.values()):
+        if not spec:
+            raise ValueError(f"variant {ids[v]!r} has no indicators")
+        for indicator, sign in spec.items():
+            if sign not in (1, -1):
+                raise ValueError(f"sign of {indicator!r} in variant {ids[v]!r} must be 1 or -1, got {sign!r}")
+            signs[v, indicators.index(indicator)] = sign
+    return ids, indicators, signs
+
+
+# ----------------------------
+# Function 2: Batched standardize + decompose
+# ----------------------------
+def evaluate_variants(df, variants=None, year_range=None, exclude=EXCLUDED_COUNTRIES):
+    """
+    PC1 scores of every variant, each equal to compute_index() on its definition.
+
+    Parameters:
+    - variants: see variant_matrix(); default DEFAULT_VARIANTS
+    - year_range: (min, max), default YEAR_RANGE
+
+    Returns:
+    - scores: tidy DataFrame ['variant', 'Country Name', 'Year', 'score']
+    - loadings: tidy DataFrame ['variant', 'indicator', 'sign', 'loading',
+      'explained_variance_ratio'] (PC1 loadings, ratio repeated per row)
+    """
+    ids, indicators, signs = variant_matrix(DEFAULT_VARIANTS if variants is None else variants)
+    countries, years, present, values = filled_block(df, indicators, year_range, exclude)
+
+    # Candidate rows: every country-year of the notebook pivot
+    c_idx, y_idx = np.nonzero(present)
+    X = values[c_idx, y_idx]
+    used = signs != 0
+    # A row belongs to a variant when its indicators are complete after filling
+    rows = ~(np.isnan(X)[None, :, :] & used[:, None, :]).any(axis=2)
+    X = np.nan_to_num(X)
+
+    # Per-variant moments of the recoded indicators (unused indicators have sign 0)
+    weights = rows.astype(np.float64)
+    n = weights.sum(axis=1)
+    if (n < 2).any():
+        empty = [ids[v] for v in np.flatnonzero(n < 2)]
+        raise ValueError(f"variants with fewer than two complete rows: {empty}")
+    mean = (weights @ X) / n[:, None] * signs
+    X_centred = X[None, :, :] * signs[:, None, :] - mean[:, None, :]
+    X_centred *= weights[:, :, None]
+    covariance = np.einsum("vri,vrj->vij", X_centred, X_centred) / n[:, None, None]
+    scale = np.sqrt(np.clip(np.diagonal(covariance, axis1=1, axis2=2), 0, None))
+    scale = np.where(scale > 0, scale, 1.0)
+    correlation = covariance / (scale[:, :, None] * scale[:, None, :])
+
+    # One eigh for the whole stack; unused indicators are zero rows / columns,
+    # i.e. zero eigenvalues that never outrank PC1
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    pc1 = eigenvectors[:, :, -1]
+    pc1 = pc1 * orient_components(pc1[:, None, :])[:, 0]
+    pc1[~used] = 0.0
+    total = np.clip(eigenvalues, 0, None).sum(axis=1)
+    ratio = np.where(total > 0, eigenvalues[:, -1] / np.where(total > 0, total, 1), 0.0)
+
+    score = np.einsum("vri,vi->vr", X_centred / scale[:, None, :], pc1)
+
+    v_idx, r_idx = np.nonzero(rows)
+    scores = pd.DataFrame({
+        "variant": np.asarray(ids, dtype=object)[v_idx],
+        "Country Name": np.asarray(countries, dtype=object)[c_idx[r_idx]],
+        "Year": years[y_idx[r_idx]],
+        "score": score[v_idx, r_idx],
+    })
+    v_idx, i_idx = np.nonzero(used)
+    loadings = pd.DataFrame({
+        "variant": np.asarray(ids, dtype=object)[v_idx],
+        "indicator": np.asarray(indicators, dtype=object)[i_idx],
+        "sign": signs[v_idx, i_idx].astype(int),
+        "loading": pc1[v_idx, i_idx],
+        "explained_variance_ratio": ratio[v_idx],
+    })
+    return scores, loadings
+
+
+def variant_scores_wide(scores):
+    """
+    Pivots evaluate_variants() scores to one column per variant, for side-by-side comparison.
+    """
+    return scores.pivot_table(index=["Country Name", "Year"], columns="variant", values="score",
+                              sort=False).reset_index().rename_axis(columns=None)
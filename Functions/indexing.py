@@ -0,0 +1,238 @@
+# ----------------------------
+# FILTER INDEX
+# ----------------------------
+# filter_data() scans the whole long table with two boolean masks and sorts the
+# result on every call. A FilterIndex sorts the table once by
+# (country, indicator, year) and remembers the row range of every
+# (country, indicator) pair, so a lookup is a dict hit plus a slice.
+# Within a run the years are sorted, so a year range is two binary searches.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from Functions.interning import VOCABULARIES
+from Functions.versioning import registered_version
+
+
+# Default year range of the time-series charts; override with WBE_YEAR_RANGE="2000-2023"
+YEAR_RANGE = tuple(int(y) for y in os.environ.get("WBE_YEAR_RANGE", "2000-2023").split("-"))
+
+
+def resolve_year_range(year_range=None):
+    """
+    Returns (year_min, year_max): YEAR_RANGE if year_range is None, None ends stay open.
+    """
+    return YEAR_RANGE if year_range is None else tuple(year_range)
+
+
+def year_slice(years, year_min=None, year_max=None):
+    """
+    Slice of the rows of a sorted year array inside [year_min, year_max]
+    (binary search, no mask over the rows). None leaves that end open.
+    """
+    lo = 0 if year_min is None else int(np.searchsorted(years, year_min, side="left"))
+    hi = len(years) if year_max is None else int(np.searchsorted(years, year_max, side="right"))
+    return slice(lo, max(lo, hi))
+
+
+def _canonical_codes(values, column):
+    """
+    (codes, labels) of a key column; name columns are merged by canonical label.
+    """
+    codes, uniques = pd.factorize(values)
+    vocabulary = VOCABULARIES.get(column)
+    if vocabulary is None:
+        return codes, uniques
+    canonical = np.array([vocabulary.canonical(label) for label in uniques], dtype=object)
+    merged, labels = pd.factorize(canonical)
+    return np.where(codes >= 0, merged[np.maximum(codes, 0)], -1), labels
+
+
+class YearIndex:
+    """
+    Copy of a table sorted by (key columns..., year) plus {key: (start, stop)}.
+    Keys are the label (one key column) or a tuple of labels.
+    """
+
+    def __init__(self, df, key_cols=("Country Name",), year_col="Year"):
+        self.key_cols = tuple(key_cols)
+        self.year_col = year_col
+        # Name columns are coded by canonical label, so aliases in the data form one run
+        factorized = [_canonical_codes(df[col], col) for col in self.key_cols]
+        years = df[year_col].to_numpy()
+
+        # One stable sort by (keys..., year); rows with a missing key are left out
+        order = np.lexsort((years,) + tuple(codes for codes, _ in reversed(factorized)))
+        has_key = np.ones(len(order), dtype=bool)
+        for codes, _ in factorized:
+            has_key &= codes[order] >= 0
+        order = order[has_key]
+        self.sorted = df.iloc[order]
+        self.years = years[order]
+        sorted_codes = [codes[order] for codes, _ in factorized]
+
+        # Row ranges of each key run
+        if len(order):
+            changed = np.zeros(len(order) - 1, dtype=bool)
+            for codes in sorted_codes:
+                changed |= np.diff(codes) != 0
+            breaks = np.flatnonzero(changed) + 1
+            starts = np.concatenate([[0], breaks])
+            stops = np.concatenate([breaks, [len(order)]])
+        else:
+            starts = stops = np.array([], dtype=np.int64)
+
+        labels = [np.asarray(uniques, dtype=object)[codes[starts]]
+                  for codes, (_, uniques) in zip(sorted_codes, factorized)]
+        keys = labels[0] if len(labels) == 1 else list(zip(*labels))
+        self.ranges = {key: (int(a), int(b)) for key, a, b in zip(keys, starts, stops)}
+
+    def window(self, key, year_range=(None, None)):
+        """
+        Row slice (into .sorted) of one key inside the year range.
+        """
+        start, stop = self.ranges.get(key, (0, 0))
+        rows = year_slice(self.years[start:stop], *year_range)
+        return slice(start + rows.start, start + rows.stop)
+
+    def series(self, keys, value_column, year_range=(None, None)):
+        """
+        Returns [(position in keys, key, years, values)] for keys with rows in
+        the year range - the layout of split_series().
+        """
+        values = self.sorted[value_column].to_numpy()
+        result = []
+        for i, key in enumerate(keys):
+            rows = self.window(key, year_range)
+            if rows.stop > rows.start:
+                result.append((i, key, self.years[rows], values[rows]))
+        return result
+
+
+class FilterIndex(YearIndex):
+    """
+    YearIndex on (country, indicator): {(country, indicator): (start, stop)}.
+    """
+
+    def __init__(self, df, country_col="Country Name", indicator_col="Indicator Name", year_col="Year"):
+        super().__init__(df, (country_col, indicator_col), year_col)
+
+    def lookup(self, country, indicator, year_range=(None, None)):
+        """
+        Returns the rows of (country, indicator) sorted by Year - the same frame
+        filter_data() returns - in time proportional to the result.
+        """
+        return self.sorted.iloc[self.window((country, indicator), year_range)]
+
+
+# ----------------------------
+# Function 1: One index per dataset version
+# ----------------------------
+_index_cache = OrderedDict()
+_INDEX_CACHE_SIZE = 4
+# Sessions run in threads: every read / reorder / eviction of the LRU holds the lock
+_index_lock = threading.Lock()
+
+
+def _build_index(df, key_cols):
+    if tuple(key_cols) == ("Country Name", "Indicator Name"):
+        return FilterIndex(df)
+    return YearIndex(df, key_cols)
+
+
+def _keys_mask(df, key_cols, keys):
+    """
+    Rows whose key columns hold one of the requested keys (any spelling).
+    """
+    keys = [key if isinstance(key, tuple) else (key,) for key in keys]
+    mask = np.ones(len(df), dtype=bool)
+    for j, col in enumerate(key_cols):
+        wanted = {key[j] for key in keys}
+        vocabulary = VOCABULARIES.get(col)
+        if vocabulary is not None:
+            wanted = {vocabulary.canonical(name) for name in wanted}
+            wanted = [label for label in df[col].unique()
+                      if not pd.isna(label) and vocabulary.canonical(label) in wanted]
+        mask &= df[col].isin(wanted).to_numpy()
+    return mask
+
+
+def get_year_index(df, key_cols=("Country Name",), keys=None):
+    """
+    Returns the YearIndex of df on key_cols. Registered datasets (see
+    Functions/versioning.py) build it once per dataset version. Any other frame
+    is neither hashed nor cached: the index is built on the fly, over only the
+    rows of `keys` when they are given.
+    """
+    version = registered_version(df)
+    if version is None:
+        return _build_index(df if keys is None else df[_keys_mask(df, key_cols, keys)], key_cols)
+
+    key = (version, tuple(key_cols))
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    # Built outside the lock; if two sessions race, both results are equal
+    index = _build_index(df, key_cols)
+    with _index_lock:
+        index = _index_cache.setdefault(key, index)
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def get_filter_index(df, keys=None):
+    """
+    Returns the FilterIndex for df (see get_year_index()); keys are
+    (country, indicator) pairs.
+    """
+    return get_year_index(df, ("Country Name", "Indicator Name"), keys)
+
+
+# ----------------------------
+# Function 2: Benchmark
+# ----------------------------
+def benchmark_filter_lookup(df, scales=(1, 10, 100), lookups=50):
+    """
+    Times filter_data-style scans against indexed lookups on copies of df
+    enlarged by `scales` (extra copies get renamed countries, so the size of
+    each result stays the same while the table grows).
+
+    Returns:
+    - DataFrame ['rows', 'scan_ms', 'indexed_ms', 'build_ms'] (per lookup / per build)
+    """
+    pairs = df[["Country Name", "Indicator Name"]].drop_duplicates().to_numpy()
+    pairs = pairs[np.random.default_rng(0).choice(len(pairs), size=lookups)]
+
+    results = []
+    for scale in scales:
+        copies = [df] + [df.assign(**{"Country Name": df["Country Name"].astype(str) + f" #{k}"})
+                         for k in range(1, scale)]
+        big = pd.concat(copies, ignore_index=True)
+
+        t0 = time.perf_counter()
+        for country, indicator in pairs:
+            big[(big["Country Name"] == country) & (big["Indicator Name"] == indicator)].sort_values("Year")
+        scan_ms = (time.perf_counter() - t0) * 1000 / lookups
+
+        t0 = time.perf_counter()
+        index = FilterIndex(big)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        for country, indicator in pairs:
+            index.lookup(country, indicator)
+        indexed_ms = (time.perf_counter() - t0) * 1000 / lookups
+
+        results.append({"rows": len(big), "scan_ms": scan_ms, "indexed_ms": indexed_ms, "build_ms": build_ms})
+
+    return pd.DataFrame(results)
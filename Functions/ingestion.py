@@ -0,0 +1,127 @@
+# ----------------------------
+# INGESTION
+# ----------------------------
+# Importable version of Notebooks/data transformation.ipynb: fetches the eight
+# sheet tabs (IMF + World Bank) concurrently, reshapes them to the long format
+# in one pass (Functions/reshape.py) and returns a single table with the
+# columns of Full_country_list.csv.
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from Functions.reshape import melt_years, LONG_COLUMNS
+from Functions.snapshot import fetch_csv, parse_csv
+
+
+SPREADSHEET_ID = "1BV0koOEqQs580tEPGv9bpZYUfY8q8UTfZGTcEoK_VtQ"
+
+COUNTRIES = [
+    'Germany', 'Denmark', 'Poland', 'United States', 'Chile', 'Costa Rica', 'Japan',
+    'China', 'Indonesia', 'South Africa', 'Ghana', "Cote d'Ivoire"
+]
+
+# IMF indicator names -> names used in the dashboard
+IMF_INDICATOR_MAP = {
+    'Gross domestic product (GDP), Current prices, Per capita, US dollar': 'GDP per capita',
+    'Gross national savings, Percent of GDP': 'National savings (% GDP)',
+    'All Items, Consumer price index (CPI), End-of-period (EoP)': 'Inflation (CPI, %)',
+    'Unemployment rate': 'Unemployment levels (%)'
+}
+
+# World Bank layout: Country Name, Indicator Name, <year columns>
+_WB = {"country_col": "Country Name", "indicator_col": "Indicator Name"}
+
+# Year columns are detected automatically (see Functions/reshape.py)
+SOURCES = {
+    "IMF_data_df": {"gid": "1952168269", "country_col": "COUNTRY", "indicator_col": "INDICATOR",
+                    "indicator_map": IMF_INDICATOR_MAP},
+    "urban_population_df": {"gid": "1020209628", **_WB},
+    "income_group_df": {"gid": "887547605", **_WB},
+    "life_expectancy_df": {"gid": "1168409358", **_WB},
+    "gini_index_df": {"gid": "1058701335", **_WB},
+    "poverty_rate_df": {"gid": "917968550", **_WB},
+    "birth_rate_df": {"gid": "701342270", **_WB},
+    "health_expenditure_df": {"gid": "1186064842", **_WB},
+}
+
+# The notebook never added the income group tab to the final table
+DEFAULT_SOURCES = [name for name in SOURCES if name != "income_group_df"]
+
+
+def source_url(spec, spreadsheet_id=SPREADSHEET_ID):
+    if "url" in spec:
+        return spec["url"]
+    return f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={spec['gid']}"
+
+
+# ----------------------------
+# Function 1: Reshape one source to the long format
+# ----------------------------
+def reshape_source(df, spec, countries=COUNTRIES):
+    """
+    Melts the year columns of one source into rows and returns
+    ['Country Name', 'Indicator Name', 'Year', 'Value'] (empty cells dropped).
+    """
+    return melt_years([(df, spec)], countries=countries)
+
+
+# ----------------------------
+# Function 2: Fetch + parse one source (runs in a worker thread)
+# ----------------------------
+def _fetch_one(spec, timeout):
+    t0 = time.perf_counter()
+    raw, _ = fetch_csv(source_url(spec), timeout=timeout)
+    return parse_csv(raw), time.perf_counter() - t0
+
+
+# ----------------------------
+# Function 3: Concurrent ingestion of all sources
+# ----------------------------
+def ingest_sources(sources=None, countries=COUNTRIES, max_workers=8, timeout=30,
+                   errors="raise", timings=None):
+    """
+    Fetches and parses the sources concurrently (bounded thread pool) and
+    reshapes all of them into one long table in a single pass.
+
+    Parameters:
+    - sources: list of names from SOURCES or dict {name: spec} (default: DEFAULT_SOURCES)
+    - countries: countries to keep (None keeps all)
+    - max_workers: maximum number of parallel downloads
+    - timeout: per-source network timeout in seconds
+    - errors: "raise" to fail on the first broken source, "skip" to leave it out
+    - timings: optional dict, filled with {name: seconds or exception}
+
+    Returns:
+    - DataFrame ['Country Name', 'Indicator Name', 'Year', 'Value']
+    """
+    if sources is None:
+        sources = DEFAULT_SOURCES
+    if not isinstance(sources, dict):
+        sources = {name: SOURCES[name] for name in sources}
+    if timings is None:
+        timings = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            name: pool.submit(_fetch_one, spec, timeout)
+            for name, spec in sources.items()
+        }
+
+        # Collect in source order so the output is deterministic
+        wide_frames = []
+        for name, future in futures.items():
+            try:
+                wide_df, seconds = future.result()
+            except Exception as e:
+                timings[name] = e
+                if errors == "raise":
+                    raise
+                continue
+            timings[name] = seconds
+            wide_frames.append((wide_df, sources[name]))
+
+    if not wide_frames:
+        return pd.DataFrame(columns=LONG_COLUMNS)
+    return melt_years(wide_frames, countries=countries)
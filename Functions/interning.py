@@ -0,0 +1,240 @@
+# ----------------------------
+# INTERNING
+# ----------------------------
+# Country and indicator names arrive in several spellings ("Poland" vs
+# "Poland, Republic of", "Inflation (CPI, %))" with a stray bracket). At load
+# time every alias is mapped to one canonical integer ID and the name columns
+# become categoricals whose codes ARE those IDs, so joins, merges and filters
+# compare small integers and the label is only looked up when rendering.
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from Functions.compact import compact_long_table
+
+
+# Countries: ISO3 code -> display label (ID = position in this dict)
+COUNTRY_CODES = {
+    "DEU": "Germany",
+    "DNK": "Denmark",
+    "POL": "Poland",
+    "USA": "United States",
+    "CHL": "Chile",
+    "CRI": "Costa Rica",
+    "JPN": "Japan",
+    "CHN": "China",
+    "IDN": "Indonesia",
+    "ZAF": "South Africa",
+    "GHA": "Ghana",
+    "CIV": "Cote d'Ivoire",
+}
+
+# Other spellings used by the IMF / World Bank exports
+COUNTRY_ALIASES = {
+    "Poland, Republic of": "POL",
+    "United States of America": "USA",
+    "China, People's Republic of": "CHN",
+    "Côte d'Ivoire": "CIV",
+    "Cote D'Ivoire": "CIV",
+    "Costa Rica, Republic of": "CRI",
+    "South Africa, Republic of": "ZAF",
+    "Germany, Federal Republic of": "DEU",
+}
+
+INDICATOR_LABELS = [
+    "GDP per capita",
+    "Unemployment levels (%)",
+    "Inflation (CPI, %)",
+    "National savings (% GDP)",
+    "Life expectancy at birth, total (years)",
+    "Gini index",
+    "Birth rate, crude (per 1,000 people)",
+    "Current health expenditure (% of GDP)",
+    "Poverty headcount ratio at national poverty lines (% of population)",
+    "Urban population (% of total population)",
+]
+
+# Matched after clean_label(), so "Inflation (CPI, %))" is already "Inflation (CPI, %)"
+INDICATOR_ALIASES = {
+    "Inflation (CPI)": "Inflation (CPI, %)",
+    "Inflation (CPI, Index)": "Inflation (CPI, %)",
+}
+
+
+def clean_label(name):
+    """
+    Strips and collapses whitespace and drops unmatched closing brackets.
+    """
+    name = re.sub(r"\s+", " ", str(name)).strip()
+    while name.count(")") > name.count("(") and ")" in name:
+        i = name.rfind(")")
+        name = name[:i] + name[i + 1:]
+    return name.strip()
+
+
+class Vocabulary:
+    """
+    Append-only label <-> integer ID table with alias resolution.
+
+    Attributes:
+    - labels: canonical label of every ID (ID = position)
+    """
+
+    def __init__(self, labels, aliases=None, codes=None):
+        self.labels = []
+        self.codes = {}
+        self._ids = {}
+        self._lock = threading.Lock()
+        for label in labels:
+            self._add(label)
+        for code, label in (codes or {}).items():
+            self.codes[code] = self._ids[self._key(label)]
+            self._ids[self._key(code)] = self.codes[code]
+        for alias, target in (aliases or {}).items():
+            target_id = self.codes[target] if target in self.codes else self._ids[self._key(target)]
+            self._ids[self._key(alias)] = target_id
+
+    @staticmethod
+    def _key(name):
+        return clean_label(name).casefold()
+
+    def _add(self, label):
+        key = self._key(label)
+        if key not in self._ids:
+            self._ids[key] = len(self.labels)
+            self.labels.append(clean_label(label))
+        return self._ids[key]
+
+    def id(self, name, add=False):
+        """
+        Canonical ID of a name or alias (-1 if unknown and add=False).
+        """
+        found = self._ids.get(self._key(name))
+        if found is None and add:
+            with self._lock:
+                found = self._add(name)
+        return -1 if found is None else found
+
+    def canonical(self, name):
+        """
+        Canonical label for a name or alias (the cleaned name if unknown).
+        """
+        i = self.id(name)
+        return self.labels[i] if i >= 0 else clean_label(name)
+
+    def encode(self, values, add=True):
+        """
+        IDs for an array of names. Every distinct name is resolved once.
+        """
+        codes, uniques = pd.factorize(pd.Series(values, copy=False).astype(object), use_na_sentinel=True)
+        ids = np.array([self.id(u, add=add) for u in uniques] + [-1], dtype=np.int32)
+        return ids[codes]
+
+    def decode(self, ids):
+        """
+        Labels for an array of IDs (render time).
+        """
+        return np.asarray(self.labels, dtype=object)[np.asarray(ids)]
+
+    def categorical(self, ids):
+        """
+        Categorical whose codes are the IDs (-1 = missing).
+        """
+        return pd.Categorical.from_codes(np.asarray(ids), categories=list(self.labels))
+
+
+COUNTRIES = Vocabulary(COUNTRY_CODES.values(), COUNTRY_ALIASES, codes=COUNTRY_CODES)
+INDICATORS = Vocabulary(INDICATOR_LABELS, INDICATOR_ALIASES)
+
+VOCABULARIES = {"Country Name": COUNTRIES, "Indicator Name": INDICATORS}
+
+
+# ----------------------------
+# Function 1: Intern at load time
+# ----------------------------
+def intern_labels(df):
+    """
+    Returns a copy of df whose 'Country Name' / 'Indicator Name' columns (where
+    present) are categoricals with codes = canonical IDs and canonical labels.
+    Names not in the vocabulary are added as new IDs.
+    """
+    df = df.copy()
+    for column, vocabulary in VOCABULARIES.items():
+        if column in df.columns:
+            df[column] = vocabulary.categorical(vocabulary.encode(df[column]))
+    return df
+
+
+def intern_compact_table(df):
+    """
+    compact_long_table() followed by intern_labels() - transform of the
+    "indicators" dataset.
+    """
+    return intern_labels(compact_long_table(df))
+
+
+# ----------------------------
+# Function 2: Integer-key filters and joins
+# ----------------------------
+def is_interned(series):
+    """
+    True if series is a categorical whose codes are the vocabulary IDs.
+    """
+    vocabulary = VOCABULARIES.get(series.name)
+    if vocabulary is None or not isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    categories = series.cat.categories
+    return len(categories) <= len(vocabulary.labels) and \
+        list(categories) == vocabulary.labels[:len(categories)]
+
+
+def key_mask(df, countries=None, indicators=None):
+    """
+    Boolean mask for rows of the given countries / indicators (names or aliases).
+    On interned columns this compares integer codes; otherwise canonical labels.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for column, names in (("Country Name", countries), ("Indicator Name", indicators)):
+        if names is None:
+            continue
+        if isinstance(names, str):
+            names = [names]
+        vocabulary = VOCABULARIES[column]
+        if is_interned(df[column]):
+            ids = np.array([vocabulary.id(n) for n in names], dtype=np.int32)
+            mask &= np.isin(df[column].cat.codes.to_numpy(), ids[ids >= 0])
+        else:
+            # Only the requested names and the distinct labels are canonicalized
+            # (unique() on the column's own dtype, no object copy of the rows);
+            # the rows are then matched with one plain isin
+            wanted = {vocabulary.canonical(n) for n in names}
+            keep = [label for label in df[column].unique()
+                    if not pd.isna(label) and vocabulary.canonical(label) in wanted]
+            mask &= df[column].isin(keep).to_numpy()
+    return mask
+
+
+def join_on_ids(left, right, on=("Country Name",), how="inner", **kwargs):
+    """
+    Merges two frames on the integer IDs of the name columns in `on` (plus any
+    other key columns, e.g. 'Year'), so differently spelled names still match.
+    """
+    on = list(on)
+    id_columns = [c for c in on if c in VOCABULARIES]
+    left, right = left.copy(), right.copy()
+    keys = []
+    for column in on:
+        if column in id_columns:
+            vocabulary = VOCABULARIES[column]
+            key = f"_{column} ID"
+            left[key] = vocabulary.encode(left[column])
+            right[key] = vocabulary.encode(right[column])
+            right = right.drop(columns=column)
+            keys.append(key)
+        else:
+            keys.append(column)
+    merged = left.merge(right, on=keys, how=how, **kwargs)
+    return merged.drop(columns=[k for k in keys if k.startswith("_")])
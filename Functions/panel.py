@@ -0,0 +1,144 @@
+# ----------------------------
+# PANEL CUBE
+# ----------------------------
+# Dense country x indicator x year array built once from the long table.
+# "Series for these countries and this indicator over this year range" then is
+# plain array slicing instead of boolean masks over every row of the long table.
+
+import numpy as np
+import pandas as pd
+
+from Functions.interning import COUNTRIES, INDICATORS
+
+
+class PanelCube:
+    """
+    values[c, i, y] holds the value for country c, indicator i and year
+    years[0] + y (NaN where there is no data).
+
+    Attributes:
+    - countries, indicators: label arrays (position -> label)
+    - years: int array of the dense year axis
+    - present[c, i, y]: True where the long table had a row (its value may be NaN)
+    - country_pos, indicator_pos: label -> position lookups
+    """
+
+    def __init__(self, values, countries, indicators, years, present=None):
+        self.values = values
+        self.present = ~np.isnan(values) if present is None else present
+        self.countries = np.asarray(countries, dtype=object)
+        self.indicators = np.asarray(indicators, dtype=object)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.country_pos = {c: i for i, c in enumerate(self.countries)}
+        self.indicator_pos = {c: i for i, c in enumerate(self.indicators)}
+
+    # ----------------------------
+    # Build
+    # ----------------------------
+    @classmethod
+    def from_long(cls, df, country_col="Country Name", indicator_col="Indicator Name",
+                  year_col="Year", value_col="Value", dtype=np.float64):
+        """
+        Builds the cube from a long table. Labels are canonicalised (aliases
+        share one cell); duplicate (country, indicator, year) rows are averaged,
+        like pivot_table does.
+        """
+        # Rows without a year or label have no cell (factorize would code them -1)
+        df = df[df[year_col].notna() & df[country_col].notna() & df[indicator_col].notna()]
+        c_codes, countries = _canonical_codes(df[country_col], COUNTRIES)
+        i_codes, indicators = _canonical_codes(df[indicator_col], INDICATORS)
+        year_values = df[year_col].to_numpy(dtype=np.int64)
+        first_year = int(year_values.min()) if len(year_values) else 0
+        n_years = int(year_values.max()) - first_year + 1 if len(year_values) else 0
+        y_codes = year_values - first_year
+
+        shape = (len(countries), len(indicators), n_years)
+        flat = np.ravel_multi_index((c_codes, i_codes, y_codes), shape)
+        values = df[value_col].to_numpy(dtype=np.float64)
+        has_value = ~np.isnan(values)
+
+        sums = np.bincount(flat[has_value], weights=values[has_value], minlength=np.prod(shape))
+        counts = np.bincount(flat[has_value], minlength=np.prod(shape))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cube = np.where(counts > 0, sums / counts, np.nan).astype(dtype).reshape(shape)
+        present = (np.bincount(flat, minlength=np.prod(shape)) > 0).reshape(shape)
+
+        return cls(cube, countries, indicators, np.arange(first_year, first_year + n_years), present)
+
+    # ----------------------------
+    # Lookups
+    # ----------------------------
+    def _country_positions(self, countries):
+        """
+        Returns (kept labels, positions) for the requested countries in request order.
+        Unknown countries are skipped.
+        """
+        labels = [c for c in countries if c in self.country_pos]
+        return labels, np.array([self.country_pos[c] for c in labels], dtype=np.int64)
+
+    def _year_slice(self, year_min=None, year_max=None):
+        lo = 0 if year_min is None else max(0, int(year_min) - int(self.years[0]))
+        hi = len(self.years) if year_max is None else max(0, int(year_max) - int(self.years[0]) + 1)
+        return slice(lo, min(hi, len(self.years)))
+
+    # ----------------------------
+    # Slices
+    # ----------------------------
+    def series(self, countries, indicator, year_min=None, year_max=None):
+        """
+        Returns (country labels, years, values) with values shaped
+        (len(country labels), len(years)) for one indicator.
+        """
+        labels, c_pos = self._country_positions(countries)
+        years = self._year_slice(year_min, year_max)
+        if indicator not in self.indicator_pos:
+            return labels, self.years[years], np.full((len(labels), len(self.years[years])), np.nan)
+        return labels, self.years[years], self.values[c_pos, self.indicator_pos[indicator], years]
+
+    def block(self, countries, indicators, year_min=None, year_max=None):
+        """
+        Returns (country labels, indicator labels, years, values[c, i, y]).
+        """
+        c_labels, c_pos = self._country_positions(countries)
+        i_labels = [i for i in indicators if i in self.indicator_pos]
+        i_pos = np.array([self.indicator_pos[i] for i in i_labels], dtype=np.int64)
+        years = self._year_slice(year_min, year_max)
+        return c_labels, i_labels, self.years[years], self.values[np.ix_(c_pos, i_pos)][:, :, years]
+
+    def to_long(self, countries, indicators, year_min=None, year_max=None, dropna=True, present_only=False):
+        """
+        Returns the slice as a long DataFrame sorted by Year, in the same layout
+        as the filtered frames of Functions/functions.py.
+
+        - dropna: leave out cells without a value
+        - present_only: keep exactly the cells that had a row in the long table
+          (rows with a NaN value included, like filtering the long table)
+        """
+        c_labels, i_labels, years, values = self.block(countries, indicators, year_min, year_max)
+        c_idx, i_idx, y_idx = np.meshgrid(
+            np.arange(len(c_labels)), np.arange(len(i_labels)), np.arange(len(years)), indexing="ij"
+        )
+        long_df = pd.DataFrame({
+            "Country Name": np.asarray(c_labels, dtype=object)[c_idx.ravel()],
+            "Indicator Name": np.asarray(i_labels, dtype=object)[i_idx.ravel()],
+            "Year": years[y_idx.ravel()],
+            "Value": values.ravel(),
+        })
+        if present_only:
+            _, c_pos = self._country_positions(countries)
+            i_pos = np.array([self.indicator_pos[i] for i in i_labels], dtype=np.int64)
+            present = self.present[np.ix_(c_pos, i_pos)][:, :, self._year_slice(year_min, year_max)]
+            long_df = long_df[present.ravel()]
+        elif dropna:
+            long_df = long_df[long_df["Value"].notna()]
+        return long_df.sort_values("Year", kind="stable").reset_index(drop=True)
+
+
+def _canonical_codes(labels, vocabulary):
+    """
+    (codes, sorted canonical labels) of a label column; every distinct label is resolved once.
+    """
+    codes, uniques = pd.factorize(labels.astype(object))
+    canonical = np.array([vocabulary.canonical(u) for u in uniques], dtype=object)
+    merged, labels = pd.factorize(canonical, sort=True)
+    return merged[codes], labels
@@ -0,0 +1,349 @@
+# ----------------------------
+# LAZY QUERIES
+# ----------------------------
+# Chainable query builder over an on-disk columnar copy of the long table:
+#
+#     panel(df).where(countries=[...], indicators=[...]).years(2000, 2023).pivot().mean_by("country")
+#
+# Each call only records a step of the plan. collect() reads just the needed
+# columns and row groups from Parquet (filters and projection are pushed into
+# pyarrow.dataset) and computes the result in one pass over the surviving rows
+# (one bincount per output), instead of materializing a filtered frame, a
+# pivot and a groupby one after the other.
+
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from Functions.interning import VOCABULARIES
+from Functions.snapshot import SNAPSHOT_DIR
+from Functions.versioning import dataset_version
+
+
+LEVELS = {"country": "Country Name", "indicator": "Indicator Name", "year": "Year"}
+
+QUERY_DIR = os.path.join(SNAPSHOT_DIR, "query")
+
+# Rows per Parquet row group of the query store; smaller groups prune finer
+ROW_GROUP_SIZE = 4096
+
+
+# ----------------------------
+# Function 1: On-disk columnar copy
+# ----------------------------
+def write_query_store(df, path=None):
+    """
+    Writes the long table as Parquet sorted by (indicator, country, year), so
+    the row group statistics let filters on indicator / country skip most of
+    the file. Written once per dataset version.
+
+    Returns:
+    - path of the Parquet file
+    """
+    if path is None:
+        path = os.path.join(QUERY_DIR, f"indicators-{dataset_version(df)}.parquet")
+    if os.path.exists(path):
+        return path
+
+    table = pa.table({
+        "Country Name": pa.array(df["Country Name"].astype(str).to_numpy(dtype=object), pa.string()),
+        "Indicator Name": pa.array(df["Indicator Name"].astype(str).to_numpy(dtype=object), pa.string()),
+        "Year": pa.array(df["Year"].to_numpy(dtype=np.int64)),
+        "Value": pa.array(df["Value"].to_numpy(dtype=np.float64), from_pandas=True),
+    })
+    table = table.sort_by([("Indicator Name", "ascending"), ("Country Name", "ascending"), ("Year", "ascending")])
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    pq.write_table(table, tmp, row_group_size=ROW_GROUP_SIZE,
+                   use_dictionary=["Country Name", "Indicator Name"])
+    os.replace(tmp, path)
+    return path
+
+
+def panel(source):
+    """
+    Starts a lazy query.
+
+    Parameters:
+    - source: long DataFrame (written once to the query store), a Parquet
+      file, or a hive-partitioned Parquet directory (e.g. Functions/bulk.py)
+    """
+    if isinstance(source, pd.DataFrame):
+        source = write_query_store(source)
+    return Query(source)
+
+
+# ----------------------------
+# Plan
+# ----------------------------
+@dataclass(frozen=True)
+class Query:
+    """
+    Immutable query plan; every builder method returns a new plan.
+    """
+    source: str
+    countries: tuple = None
+    indicators: tuple = None
+    year_min: int = None
+    year_max: int = None
+    pivoted: bool = False
+    group_level: str = None
+
+    def where(self, countries=None, indicators=None):
+        """
+        Keeps the given countries / indicators (names or aliases).
+        """
+        plan = self
+        if countries is not None:
+            plan = replace(plan, countries=tuple([countries] if isinstance(countries, str) else countries))
+        if indicators is not None:
+            plan = replace(plan, indicators=tuple([indicators] if isinstance(indicators, str) else indicators))
+        return plan
+
+    def years(self, year_min=None, year_max=None):
+        """
+        Keeps years in [year_min, year_max] (None leaves that end open).
+        """
+        return replace(self, year_min=year_min, year_max=year_max)
+
+    def pivot(self):
+        """
+        One column per indicator, one row per (country, year); duplicates averaged.
+        """
+        return replace(self, pivoted=True)
+
+    def mean_by(self, level):
+        """
+        Averages Value per `level` ('country', 'indicator' or 'year'), per indicator
+        unless grouping by indicator. After pivot() the indicators stay columns.
+        """
+        if level not in LEVELS:
+            raise ValueError(f"level must be one of {sorted(LEVELS)}, got {level!r}")
+        return replace(self, group_level=level)
+
+    # ----------------------------
+    # Execution
+    # ----------------------------
+    def _dataset(self):
+        if os.path.isdir(self.source):
+            return ds.dataset(self.source, format="parquet", partitioning="hive")
+        return ds.dataset(self.source, format="parquet")
+
+    def _filter(self, dataset):
+        """
+        Pushdown expression. Requested names are matched to the labels stored
+        on disk through their canonical form, so aliases on either side match.
+        """
+        expression = None
+
+        def conjoin(part):
+            return part if expression is None else expression & part
+
+        for column, names in (("Country Name", self.countries), ("Indicator Name", self.indicators)):
+            if names is not None:
+                vocabulary = VOCABULARIES[column]
+                by_canonical = _stored_labels(self.source, dataset, column)
+                wanted = {vocabulary.canonical(n) for n in names}
+                stored = [label for name in wanted for label in by_canonical.get(name, [])]
+                expression = conjoin(pc.field(column).isin(stored))
+        if self.year_min is not None:
+            expression = conjoin(pc.field("Year") >= self.year_min)
+        if self.year_max is not None:
+            expression = conjoin(pc.field("Year") <= self.year_max)
+        return expression
+
+    def _columns(self):
+        # Projection pushdown: only the key columns of the output are read
+        # (filters on other columns are still applied by the scan); a pivot
+        # keeps every key, its cells are averaged before any grouping
+        if self.pivoted or self.group_level is None:
+            return ["Country Name", "Indicator Name", "Year", "Value"]
+        if self.group_level == "indicator":
+            return ["Indicator Name", "Value"]
+        if self.group_level == "year":
+            return ["Indicator Name", "Year", "Value"]
+        if self.group_level == "country":
+            return ["Country Name", "Indicator Name", "Value"]
+
+    def explain(self):
+        """
+        Returns the plan as text: scanned columns and pushed-down filter.
+        """
+        dataset = self._dataset()
+        return (f"scan {self.source}\n"
+                f"  columns: {self._columns()}\n"
+                f"  filter:  {self._filter(dataset)}\n"
+                f"  output:  {'pivot ' if self.pivoted else ''}"
+                f"{'mean by ' + self.group_level if self.group_level else 'rows'}")
+
+    def collect(self):
+        """
+        Executes the plan and returns a DataFrame.
+        """
+        dataset = self._dataset()
+        table = dataset.to_table(columns=self._columns(), filter=self._filter(dataset))
+        return _execute(table, self.pivoted, self.group_level)
+
+
+# {canonical label: [labels stored on disk]} per (source, mtime, column):
+# read once, then filters are resolved in memory
+_label_cache = {}
+
+
+def _stored_labels(source, dataset, column):
+    key = (source, os.path.getmtime(source), column)
+    labels = _label_cache.get(key)
+    if labels is None:
+        vocabulary = VOCABULARIES[column]
+        values = dataset.to_table(columns=[column]).column(0)
+        labels = {}
+        for label in pc.unique(values).to_pylist():
+            if label is not None:
+                labels.setdefault(vocabulary.canonical(label), []).append(label)
+        _label_cache[key] = labels
+    return labels
+
+
+def _codes(table, column):
+    """
+    (codes, canonical labels) of a string column; aliases share one code.
+    """
+    encoded = pc.dictionary_encode(table.column(column)).combine_chunks()
+    vocabulary = VOCABULARIES[column]
+    labels = [vocabulary.canonical(label) for label in encoded.dictionary.to_pylist()]
+    merged, uniques = pd.factorize(pd.Index(labels, dtype=object))
+    indices = encoded.indices.to_numpy(zero_copy_only=False)
+    return merged[indices], np.asarray(uniques, dtype=object)
+
+
+def _execute(table, pivoted, group_level):
+    """
+    One pass over the filtered Arrow columns: factorize the keys, then a single
+    bincount of sums and counts into the output shape.
+    """
+    if pivoted and group_level is not None:
+        # As pivot_table -> groupby: duplicates are averaged into their
+        # (country, year, indicator) cell first, then the cells per group
+        cells = _execute(table, True, None).melt(
+            id_vars=["Country Name", "Year"], var_name="Indicator Name", value_name="Value")
+        table = pa.Table.from_pandas(cells.dropna(subset=["Value"]), preserve_index=False)
+
+    values = table.column("Value").to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+    has_value = ~np.isnan(values)
+
+    if not pivoted and group_level is None:
+        result = table.to_pandas()
+        for column, vocabulary in VOCABULARIES.items():
+            if column in result.columns:
+                result[column] = result[column].map(vocabulary.canonical)
+        return result.sort_values(["Country Name", "Indicator Name", "Year"], kind="stable").reset_index(drop=True)
+
+    # Key axes of the output
+    keys = []
+    if group_level == "indicator":
+        keys.append(("Indicator Name",) + _codes(table, "Indicator Name"))
+    else:
+        if group_level in (None, "country"):
+            keys.append(("Country Name",) + _codes(table, "Country Name"))
+        if group_level in (None, "year"):
+            years = table.column("Year").to_numpy(zero_copy_only=False)
+            year_codes, year_labels = pd.factorize(years, sort=True)
+            keys.append(("Year", year_codes, np.asarray(year_labels)))
+        if not pivoted:
+            keys.append(("Indicator Name",) + _codes(table, "Indicator Name"))
+
+    if pivoted and group_level != "indicator":
+        column_codes, column_labels = _codes(table, "Indicator Name")
+    else:
+        column_codes, column_labels = np.zeros(len(values), dtype=np.int64), np.array(["Value"], dtype=object)
+
+    # Row index over the key axes, then the fused sum / count
+    shape = tuple(len(labels) for _, _, labels in keys)
+    rows = np.ravel_multi_index(tuple(codes for _, codes, _ in keys), shape) if keys else np.zeros(len(values), int)
+    n_rows, n_cols = int(np.prod(shape)), len(column_labels)
+    flat = (rows * n_cols + column_codes)[has_value]
+    sums = np.bincount(flat, weights=values[has_value], minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+    counts = np.bincount(flat, minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+
+    occupied = np.flatnonzero(counts.any(axis=1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts[occupied] > 0, sums[occupied] / np.maximum(counts[occupied], 1), np.nan)
+
+    positions = np.unravel_index(occupied, shape)
+    result = pd.DataFrame({name: labels[pos] for (name, _, labels), pos in zip(keys, positions)})
+    for k, label in enumerate(column_labels):
+        result[label] = means[:, k]
+    sort_by = [name for name, _, _ in keys]
+    return result.sort_values(sort_by, kind="stable").reset_index(drop=True) if sort_by else result
+
+
+# ----------------------------
+# Function 2: Benchmark against the eager chain
+# ----------------------------
+def benchmark_query(df, countries=None, indicators=None, year_range=(2000, 2023), repeat=5):
+    """
+    Times the eager pandas chain (mask -> pivot_table -> groupby mean) against
+    panel(df).where(...).years(...).pivot().mean_by("country").collect().
+
+    Returns:
+    - DataFrame ['approach', 'ms', 'python_peak_kb', 'arrow_peak_kb', 'peak_kb', 'rows_read']
+      - python_peak_kb is the tracemalloc peak (Python objects and NumPy arrays),
+      arrow_peak_kb the peak of the Arrow buffers (outside tracemalloc's view,
+      counted by a proxy of the default memory pool), peak_kb their sum
+    """
+    if countries is None:
+        countries = list(pd.unique(df["Country Name"]))[:8]
+    if indicators is None:
+        indicators = list(pd.unique(df["Indicator Name"]))[:3]
+    query = panel(df).where(countries=countries, indicators=indicators) \
+        .years(*year_range).pivot().mean_by("country")
+
+    def eager():
+        df_filtered = df[
+            df["Country Name"].isin(countries) & df["Indicator Name"].isin(indicators) &
+            df["Year"].between(*year_range)
+        ]
+        df_wide = df_filtered.pivot_table(index=["Country Name", "Year"], columns="Indicator Name",
+                                          values="Value", observed=True)
+        return df_wide.groupby(level="Country Name", observed=True).mean()
+
+    def lazy():
+        return query.collect()
+
+    default_pool = pa.default_memory_pool()
+    rows = []
+    for name, fn, rows_read in (
+        ("eager", eager, len(df)),
+        ("lazy", lazy, query._dataset().count_rows(filter=query._filter(query._dataset()))),
+    ):
+        fn()  # warm-up (query store, label cache)
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        ms = (time.perf_counter() - t0) * 1000 / repeat
+
+        # The result is dropped before the proxy pool is, so no buffer outlives it
+        arrow_pool = pa.proxy_memory_pool(default_pool)
+        pa.set_memory_pool(arrow_pool)
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            pa.set_memory_pool(default_pool)
+        arrow_peak = arrow_pool.max_memory()
+        rows.append({"approach": name, "ms": ms, "python_peak_kb": peak / 1024,
+                     "arrow_peak_kb": arrow_peak / 1024, "peak_kb": (peak + arrow_peak) / 1024,
+                     "rows_read": rows_read})
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,170 @@
+# ----------------------------
+# RANKING ENGINE
+# ----------------------------
+# Top-N / bottom-N rankings over precomputed per-country aggregates (e.g. the
+# window means of Functions/window_aggregates.py). Only the selected rows are
+# ordered: np.argpartition picks them in O(n), and their rank numbers are
+# counted directly (1 + number of strictly better countries), so nothing is
+# fully sorted unless the whole ranking is requested.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class RankingEngine:
+    """
+    Per-country aggregates as a (countries x measures) float matrix.
+
+    Parameters:
+    - labels: country labels (one per row)
+    - values: 2D array, or 1D for a single measure
+    - measures: column names of values
+    """
+
+    def __init__(self, labels, values, measures):
+        self.labels = np.asarray(labels, dtype=object)
+        values = np.asarray(values, dtype=np.float64)
+        self.values = values.reshape(len(self.labels), -1)
+        self.measures = list(measures)
+        self.measure_pos = {m: k for k, m in enumerate(self.measures)}
+        self.label_pos = {label: k for k, label in enumerate(self.labels)}
+
+    @classmethod
+    def from_frame(cls, df, value_columns, label_col="Country Name"):
+        """
+        Builds the engine from a frame with one row per country.
+        """
+        value_columns = [value_columns] if isinstance(value_columns, str) else list(value_columns)
+        return cls(df[label_col].to_numpy(dtype=object), df[value_columns].to_numpy(dtype=np.float64),
+                   value_columns)
+
+    # ----------------------------
+    # Selection
+    # ----------------------------
+    def _select(self, scores, n, ties):
+        """
+        Positions (into scores) of the n best scores, plus all rows tied with
+        the n-th if ties=True. Unordered.
+        """
+        n = min(n, len(scores))
+        if n <= 0:
+            return np.array([], dtype=np.int64)
+        picked = np.argpartition(-scores, n - 1)[:n]
+        if ties:
+            return np.flatnonzero(scores >= scores[picked].min())
+        return picked
+
+    @staticmethod
+    def _competition_ranks(scores, selected):
+        """
+        Rank numbers ("1224" style: tied countries share the best rank) of the
+        selected positions, counted without sorting all countries.
+        """
+        if len(selected) == 0:
+            return np.array([], dtype=np.int64)
+        return 1 + (scores[None, :] > scores[selected][:, None]).sum(axis=1)
+
+    # ----------------------------
+    # Ranking
+    # ----------------------------
+    def rank(self, measure, top_n=0, bottom_n=0, ascending=False, previous=None, ties=True):
+        """
+        Ranks countries on one measure (highest first unless ascending=True).
+
+        Parameters:
+        - top_n, bottom_n: rows to return from each end; both 0 returns every country
+        - previous: RankingEngine (or frame with label + measure columns) for the
+          previous window, used for the rank change columns
+        - ties: extend the top / bottom selection to every country tied with its last row
+
+        Returns:
+        - DataFrame ['Rank', 'Country Name', measure] (+ 'Previous Rank', 'Rank Change'),
+          best first; countries without a value are left out
+        """
+        column = self.values[:, self.measure_pos[measure]]
+        valid = np.flatnonzero(~np.isnan(column))
+        scores = column[valid] if not ascending else -column[valid]
+
+        if top_n <= 0 and bottom_n <= 0:
+            selected = np.arange(len(valid))
+        else:
+            top = self._select(scores, top_n, ties)
+            bottom = self._select(-scores, bottom_n, ties)
+            selected = np.union1d(top, bottom)
+        selected = self._ordered_valid(selected, scores, valid)
+
+        rows = valid[selected]
+        ranks = self._competition_ranks(scores, selected)
+        result = {"Rank": ranks, "Country Name": self.labels[rows], measure: column[rows]}
+
+        if previous is not None:
+            if not isinstance(previous, RankingEngine):
+                previous = RankingEngine.from_frame(previous, measure)
+            # Same country rows (the usual case: two windows of one aggregate) -> no label lookups
+            same_rows = previous.labels is self.labels or np.array_equal(previous.labels, self.labels)
+            previous_ranks = previous.ranks_of(measure, rows if same_rows else result["Country Name"],
+                                               ascending=ascending, positions=same_rows)
+            result["Previous Rank"] = previous_ranks
+            # Positive = moved up the ranking
+            result["Rank Change"] = previous_ranks - ranks
+        return pd.DataFrame(result)
+
+    def _ordered_valid(self, selected, scores, valid):
+        # Best first; ties by label so the order is deterministic
+        if len(selected) == 0:
+            return selected
+        return selected[np.lexsort((self.labels[valid[selected]].astype(str), -scores[selected]))]
+
+    def ranks_of(self, measure, labels, ascending=False, positions=False):
+        """
+        Competition ranks of the given countries on one measure (NaN where the
+        country is unknown or has no value). With positions=True, labels are
+        row positions instead of country labels.
+        """
+        column = self.values[:, self.measure_pos[measure]]
+        scores = column if not ascending else -column
+        if positions:
+            positions = np.asarray(labels, dtype=np.int64)
+        else:
+            positions = np.array([self.label_pos.get(label, -1) for label in labels], dtype=np.int64)
+        known = positions >= 0
+        known[known] = ~np.isnan(column[positions[known]])
+
+        ranks = np.full(len(positions), np.nan)
+        # NaN compares False, so countries without a value never count as better
+        ranks[known] = self._competition_ranks(scores, positions[known])
+        return ranks
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+def benchmark_ranking(n_countries=300, n_measures=50, top_n=10, bottom_n=10, repeat=200):
+    """
+    Times top/bottom-N selection (with ranks and rank change) against a full
+    sort_values + head/tail on random aggregates.
+
+    Returns:
+    - dict with the mean milliseconds per ranking for both approaches
+    """
+    rng = np.random.default_rng(0)
+    labels = np.array([f"Country {i}" for i in range(n_countries)], dtype=object)
+    measures = [f"m{k}" for k in range(n_measures)]
+    current = RankingEngine(labels, rng.normal(size=(n_countries, n_measures)).round(2), measures)
+    previous = RankingEngine(labels, rng.normal(size=(n_countries, n_measures)).round(2), measures)
+    frame = pd.DataFrame(current.values, columns=measures).assign(**{"Country Name": labels})
+
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        current.rank(measures[i % n_measures], top_n, bottom_n, previous=previous)
+    engine_ms = (time.perf_counter() - t0) * 1000 / repeat
+
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        ranked = frame.sort_values(measures[i % n_measures], ascending=False)
+        pd.concat([ranked.head(top_n), ranked.tail(bottom_n)])
+    sort_ms = (time.perf_counter() - t0) * 1000 / repeat
+
+    return {"countries": n_countries, "measures": n_measures, "engine_ms": engine_ms, "full_sort_ms": sort_ms}
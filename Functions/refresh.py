@@ -0,0 +1,101 @@
+# ----------------------------
+# STALE-WHILE-REVALIDATE REFRESH
+# ----------------------------
+# One DatasetRefresher per dataset and process. Sessions always get the current
+# DataFrame straight away; once it is older than max_age a single background
+# thread fetches the new version and swaps it in. Concurrent cold misses wait on
+# the same in-flight load instead of each downloading the sheet themselves.
+
+import threading
+import time
+from concurrent.futures import Future
+
+
+class DatasetRefresher:
+    """
+    Single-flight, stale-while-revalidate holder for one dataset.
+
+    Parameters:
+    - load: zero-argument callable returning the fresh dataset
+            (e.g. lambda: load_with_snapshot(url, "indicators", LONG_SCHEMA))
+    - max_age: seconds after which the current value is refreshed in the background
+    """
+
+    def __init__(self, load, max_age=3600):
+        self._load = load
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded_at = None
+        self._inflight = None
+        self.load_count = 0
+        self.last_error = None
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def get(self):
+        """
+        Returns the current dataset.
+
+        - fresh value  -> returned immediately
+        - stale value  -> returned immediately, one background refresh is started
+        - no value yet -> waits for the (single) in-flight load
+        """
+        with self._lock:
+            if self._value is not None:
+                if self._is_stale():
+                    self._start_locked()
+                return self._value
+            future = self._start_locked()
+        return future.result()
+
+    def refresh(self, wait=False):
+        """
+        Starts a refresh now (or joins the running one).
+        With wait=True blocks until it finished and returns the new value.
+        """
+        with self._lock:
+            future = self._start_locked()
+        return future.result() if wait else future
+
+    @property
+    def age(self):
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _is_stale(self):
+        return time.monotonic() - self._loaded_at >= self.max_age
+
+    def _start_locked(self):
+        # Caller must hold self._lock
+        if self._inflight is None:
+            self._inflight = Future()
+            threading.Thread(target=self._run, args=(self._inflight,), daemon=True).start()
+        return self._inflight
+
+    def _run(self, future):
+        try:
+            value = self._load()
+        except Exception as e:
+            with self._lock:
+                self.last_error = e
+                # Keep serving the old value, retry on the next get() after max_age
+                if self._value is not None:
+                    self._loaded_at = time.monotonic()
+                self._inflight = None
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            # Atomic swap: readers see either the old or the new DataFrame
+            self._value = value
+            self._loaded_at = time.monotonic()
+            self.load_count += 1
+            self.last_error = None
+            self._inflight = None
+        future.set_result(value)
@@ -0,0 +1,151 @@
+# ----------------------------
+# DATASET REGISTRY
+# ----------------------------
+# Named datasets (remote URL or local path, schema, refresh policy) behind one
+# loader API. Every page asks for a dataset by name; datasets that point at the
+# same source share a single refresher, so each distinct source is downloaded,
+# parsed and held in memory once per process, however many pages use it.
+
+import os
+import threading
+
+import pandas as pd
+
+from Functions.index_engine import index_scores_table
+from Functions.interning import intern_compact_table, intern_labels
+from Functions.refresh import DatasetRefresher
+from Functions.shared_data import SHARED_MODE, load_shared
+from Functions.snapshot import LONG_SCHEMA, OVERVIEW_SCHEMA, load_with_snapshot
+from Functions.versioning import register_version
+
+
+DATASETS = {}
+
+# (source, transform) -> DatasetRefresher, shared by all names with that source
+_refreshers = {}
+_lock = threading.Lock()
+
+
+# ----------------------------
+# Function 1: Register datasets
+# ----------------------------
+def register_dataset(name, source, schema=None, max_age=3600, transform=None, snapshot=None):
+    """
+    Registers a named dataset.
+
+    Parameters:
+    - name: name pages use to load the dataset
+    - source: URL of a CSV export or a local CSV / Parquet path
+    - schema: optional pyarrow schema for the snapshot (see Functions/snapshot.py)
+    - max_age: seconds before the dataset is refreshed in the background
+    - transform: optional function applied after loading (e.g. intern_compact_table)
+    - snapshot: snapshot name on disk (default: the dataset name); must be unique
+    """
+    snapshot_name = snapshot or name
+    for other_name, other in DATASETS.items():
+        if other_name != name and (other["snapshot"] or other_name) == snapshot_name:
+            raise ValueError(f"snapshot {snapshot_name!r} is already used by dataset {other_name!r}")
+    DATASETS[name] = {
+        "source": source,
+        "schema": schema,
+        "max_age": max_age,
+        "transform": transform,
+        "snapshot": snapshot,
+    }
+
+
+def _source_key(spec):
+    return (spec["source"], spec["transform"])
+
+
+def _snapshot_name(name, spec):
+    # One snapshot file per dataset: refreshers of datasets with the same source
+    # (but another transform) never write the same file
+    return spec["snapshot"] or name
+
+
+def _make_loader(name, spec):
+    source = spec["source"]
+    snapshot = _snapshot_name(name, spec)
+
+    def load():
+        if os.path.exists(source):
+            df = pd.read_parquet(source) if source.endswith(".parquet") else pd.read_csv(source)
+        else:
+            df = load_with_snapshot(source, snapshot, schema=spec["schema"], max_age=spec["max_age"])
+        # Stripped once here: served frames are shared and must not be edited by the pages
+        df.columns = [c.strip() for c in df.columns]
+        if spec["transform"] is not None:
+            df = spec["transform"](df)
+        return df
+
+    if SHARED_MODE:
+        shared_name = snapshot if spec["transform"] is None else f"{snapshot}-{spec['transform'].__name__}"
+        loader = lambda: load_shared(shared_name, load, max_age=spec["max_age"])
+    else:
+        loader = load
+
+    def load_versioned():
+        # Served frames get their version once, so the derived caches can key on it
+        df = loader()
+        register_version(df)
+        return df
+
+    return load_versioned
+
+
+# ----------------------------
+# Function 2: Load by name
+# ----------------------------
+def get_refresher(name):
+    """
+    Returns the (shared) refresher serving dataset `name`.
+    """
+    spec = DATASETS[name]
+    key = _source_key(spec)
+    with _lock:
+        if key not in _refreshers:
+            _refreshers[key] = DatasetRefresher(_make_loader(name, spec), max_age=spec["max_age"])
+        return _refreshers[key]
+
+
+def load_dataset(name):
+    """
+    Returns the current DataFrame for dataset `name`.
+    Datasets with an identical source (and transform) return the same object.
+    """
+    return get_refresher(name).get()
+
+
+def registry_status():
+    """
+    Returns one row per registered dataset with the refresher it shares.
+    """
+    rows = []
+    for name, spec in DATASETS.items():
+        refresher = _refreshers.get(_source_key(spec))
+        rows.append({
+            "name": name,
+            "source": spec["source"],
+            "shared_with": [n for n, s in DATASETS.items()
+                            if n != name and _source_key(s) == _source_key(spec)],
+            "loaded": refresher is not None and refresher.age is not None,
+            "age_s": None if refresher is None else refresher.age,
+        })
+    return pd.DataFrame(rows)
+
+
+# ----------------------------
+# Datasets used by the pages
+# ----------------------------
+INDICATORS_URL = "https://docs.google.com/spreadsheets/d/1E0lyCSxlC0ajNtzjpWo17TX5DEeEjd33E-j6c7fOBcg/export?format=csv"
+OVERVIEW_URL = "https://docs.google.com/spreadsheets/d/1M8VQzniWDbRQIgaQ6bmgylWPGtMc3dBzPnQWxwBJPqU/export?format=csv&gid=147164817"
+OVERVIEW_ALT_URL = "https://docs.google.com/spreadsheets/d/1JRp5v_2U4HMxl3aB_UZF7MHHPn3o0cAHSgn0ZeuFrvE/export?format=csv&gid=235949117"
+
+# Long indicator table: interned country/indicator IDs, int16 years, float32 values
+register_dataset("indicators", INDICATORS_URL, schema=LONG_SCHEMA, transform=intern_compact_table)
+register_dataset("overview", OVERVIEW_URL, schema=OVERVIEW_SCHEMA, transform=intern_labels)
+# Overview sheet used by Helper_Page_Katha.py / Helper_Page_Max.py
+register_dataset("overview_alt", OVERVIEW_ALT_URL, transform=intern_labels)
+# EI / WBI recomputed from the indicator table on every refresh (overview layout)
+register_dataset("index_scores", INDICATORS_URL, schema=LONG_SCHEMA, transform=index_scores_table)
@@ -0,0 +1,141 @@
+# ----------------------------
+# WIDE -> LONG YEAR RESHAPER
+# ----------------------------
+# World Bank and IMF exports are wide: one row per (country, indicator) and one
+# column per year. melt_years() turns any number of such frames into the long
+# table in one pass over a NumPy value matrix: year columns are detected
+# automatically, the indicator mapping, country filter and canonical country
+# labels are applied to the (few) wide rows, and empty cells are dropped before
+# any long rows are built.
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from Functions.interning import COUNTRIES
+
+
+LONG_COLUMNS = ["Country Name", "Indicator Name", "Year", "Value"]
+
+# "1980" (Google Sheets / IMF) or "1980 [YR1980]" (WDI bulk download)
+YEAR_COLUMN_PATTERN = re.compile(r"^\s*(\d{4})(\s*\[YR\d{4}\])?\s*$")
+
+
+# ----------------------------
+# Function 1: Detect year columns
+# ----------------------------
+def detect_year_columns(columns):
+    """
+    Returns {column name: year} for every column that looks like a year.
+    """
+    years = {}
+    for col in columns:
+        match = YEAR_COLUMN_PATTERN.match(str(col))
+        if match:
+            years[col] = int(match.group(1))
+    return years
+
+
+def _year_values(df, year_cols):
+    """
+    Returns the year block as a float matrix. Non-numeric cells (e.g. "..") become NaN.
+    """
+    block = df[year_cols]
+    if all(pd.api.types.is_numeric_dtype(t) for t in block.dtypes):
+        return block.to_numpy(dtype=np.float64, na_value=np.nan)
+    return block.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+# ----------------------------
+# Function 2: Melt many wide sources at once
+# ----------------------------
+def melt_years(sources, countries=None, categorical=True):
+    """
+    Reshapes wide year frames into one long table.
+
+    Parameters:
+    - sources: list of (df, spec) pairs. spec keys:
+        country_col   - column with the country name   (default "Country Name")
+        indicator_col - column with the indicator name (default "Indicator Name")
+        units_col     - optional column with the unit; the indicator becomes
+                        "<indicator> (<unit>)" (IMF WEO repeats a descriptor per unit)
+        indicator_map - optional {source name: dashboard name}; rows not in the map are dropped
+    - countries: optional list of countries to keep (names or aliases; matched
+                 and returned as canonical labels, see Functions/interning.py)
+    - categorical: return Country Name / Indicator Name as categoricals (much cheaper
+                   than building millions of strings; set False for plain strings)
+
+    Returns:
+    - DataFrame ['Country Name', 'Indicator Name', 'Year', 'Value'] without empty cells
+    """
+    if countries is not None:
+        wanted = {COUNTRIES.canonical(c) for c in countries}
+    row_countries, row_indicators = [], []
+    row_ids, values, years = [], [], []
+    row_offset = 0
+
+    for df, spec in sources:
+        country_col = spec.get("country_col", "Country Name")
+        indicator_col = spec.get("indicator_col", "Indicator Name")
+        units_col = spec.get("units_col")
+        indicator_map = spec.get("indicator_map")
+
+        # Canonical country label of every wide row ("Poland, Republic of" ->
+        # "Poland"), resolved once per distinct name
+        labels = df[country_col].astype(str)
+        country_names = labels.map({label: COUNTRIES.canonical(label) for label in labels.unique()})
+
+        # Source indicator label of every wide row, one per (indicator, unit) if units_col is set
+        indicator_labels = df[indicator_col].astype(str).str.strip()
+        if units_col:
+            units = df[units_col]
+            indicator_labels = indicator_labels.where(
+                units.isna(), indicator_labels + " (" + units.astype(str).str.strip() + ")")
+
+        # Row-level filtering on the wide frame (one row per country x indicator)
+        keep = df[country_col].notna() & df[indicator_col].notna()
+        if countries is not None:
+            keep &= country_names.isin(wanted)
+        if indicator_map:
+            keep &= indicator_labels.isin(indicator_map)
+        if not keep.all():
+            df, country_names, indicator_labels = df[keep], country_names[keep], indicator_labels[keep]
+
+        year_map = detect_year_columns(df.columns)
+        if df.empty or not year_map:
+            continue
+        year_cols = list(year_map)
+
+        # Single pass over the value matrix: positions of all non-empty cells
+        matrix = _year_values(df, year_cols)
+        r, c = np.nonzero(~np.isnan(matrix))
+
+        indicator_names = indicator_labels.map(indicator_map) if indicator_map else indicator_labels
+
+        row_countries.append(country_names.to_numpy(dtype=object))
+        row_indicators.append(indicator_names.to_numpy())
+        row_ids.append(r + row_offset)
+        years.append(np.asarray(list(year_map.values()), dtype=np.int64)[c])
+        values.append(matrix[r, c])
+        row_offset += len(df)
+
+    if not row_ids:
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in
+                             zip(LONG_COLUMNS, ["object", "object", "int64", "float64"])})
+
+    rows = np.concatenate(row_ids)
+
+    # Labels are factorized on the wide rows, then expanded with one take per column
+    def expand(labels):
+        codes, uniques = pd.factorize(np.concatenate(labels))
+        if categorical:
+            return pd.Categorical.from_codes(codes[rows], categories=pd.Index(uniques))
+        return np.asarray(uniques, dtype=object)[codes[rows]]
+
+    return pd.DataFrame({
+        "Country Name": expand(row_countries),
+        "Indicator Name": expand(row_indicators),
+        "Year": np.concatenate(years),
+        "Value": np.concatenate(values),
+    })
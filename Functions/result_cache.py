@@ -0,0 +1,118 @@
+# ----------------------------
+# RESULT CACHE
+# ----------------------------
+# Process-wide LRU cache for query results (filtered frames, per-country series,
+# window averages), shared by all Streamlit sessions of a server process.
+# Keys are canonical - country selections are order-insensitive and year ranges
+# normalized - and eviction keeps the total size under a byte budget.
+# Cached results are shared objects: treat them as read-only.
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_bytes(value):
+    """
+    Rough in-memory size of a cached value.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(k) + estimate_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def canonical_key(name, version, countries=None, indicator=None, years=None, **extra):
+    """
+    Builds a hashable cache key.
+    - countries: any iterable, stored as a sorted tuple (order does not matter)
+    - years: (min, max) with None for an open end, stored as ints
+    """
+    if countries is not None:
+        countries = tuple(sorted({str(c) for c in countries}))
+    if years is not None:
+        years = tuple(None if y is None else int(y) for y in years)
+    return (name, version, countries, indicator, years, tuple(sorted(extra.items())))
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by an approximate byte budget.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = estimate_bytes(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value for key, or computes, stores and returns it.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Shared by every session of this process; budget via WBE_RESULT_CACHE_MB
+RESULT_CACHE = ResultCache(float(os.environ.get("WBE_RESULT_CACHE_MB", "64")) * 1e6)
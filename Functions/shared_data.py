@@ -0,0 +1,143 @@
+# ----------------------------
+# SHARED DATA ACROSS STREAMLIT PROCESSES
+# ----------------------------
+# When several Streamlit workers run behind a load balancer, the datasets are
+# published once as uncompressed Arrow IPC files (in /dev/shm when available)
+# and every worker memory-maps them. Numeric columns are handed to pandas
+# without copying, labels stay dictionary-encoded, so the data pages are shared
+# by the OS page cache instead of being duplicated per process.
+
+import os
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: no inter-process lock there
+    fcntl = None
+
+
+def _default_shared_dir():
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm/wbe"
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(repo_root, "data_cache", "shared")
+
+
+SHARED_DIR = os.environ.get("WBE_SHARED_DIR", _default_shared_dir())
+
+# Set WBE_SHARED_DATA=1 to turn the mode on in the pages
+SHARED_MODE = os.environ.get("WBE_SHARED_DATA", "0") == "1"
+
+
+def shared_path(name):
+    return os.path.join(SHARED_DIR, f"{name}.arrow")
+
+
+# ----------------------------
+# Function 1: Publish
+# ----------------------------
+def _to_arrow_column(s):
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Missing labels have code -1; they become null indices
+        codes = s.cat.codes.to_numpy()
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, mask=codes < 0), pa.array(s.cat.categories.astype(str))
+        )
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        # from_pandas=False keeps NaN as a float value instead of a null, so the
+        # column has no validity bitmap and can be mapped into pandas zero-copy
+        return pa.array(s.to_numpy(), from_pandas=False)
+    # Plain strings are dictionary-encoded once here
+    return pa.array(s.astype(object), type=pa.string()).dictionary_encode()
+
+
+def publish_shared(df, name):
+    """
+    Writes df as an uncompressed Arrow IPC file that other processes can map.
+    The file is written next to the target and renamed, so attached readers keep
+    their (old) mapping and new readers see the complete new file.
+    """
+    os.makedirs(SHARED_DIR, exist_ok=True)
+    table = pa.table({col: _to_arrow_column(df[col]) for col in df.columns})
+
+    path = shared_path(name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+# ----------------------------
+# Function 2: Attach
+# ----------------------------
+def attach_shared_table(name):
+    """
+    Memory-maps a published dataset and returns it as an Arrow table (zero-copy).
+    """
+    source = pa.memory_map(shared_path(name), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def attach_shared(name):
+    """
+    Memory-maps a published dataset and returns a read-only DataFrame.
+    Numeric columns point directly into the mapped file; categoricals reuse the
+    mapped dictionary codes.
+    """
+    table = attach_shared_table(name)
+    return table.to_pandas(split_blocks=True, zero_copy_only=False)
+
+
+# ----------------------------
+# Function 3: Load-or-attach
+# ----------------------------
+def _is_stale(path, max_age):
+    return not os.path.exists(path) or time.time() - os.path.getmtime(path) >= max_age
+
+
+@contextmanager
+def _publish_lock(name):
+    """
+    Exclusive inter-process lock (flock on a sidecar file) around a refresh.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(SHARED_DIR, exist_ok=True)
+    with open(f"{shared_path(name)}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_shared(name, load, max_age=3600):
+    """
+    Attaches to the published dataset if it is younger than max_age.
+    Otherwise takes the publish lock, and if the file is still stale once it
+    holds it, calls load() and publishes the result. Workers that waited on the
+    lock find the fresh file and only attach, so only the first worker after an
+    expiry does the actual loading (where fcntl is available).
+    """
+    path = shared_path(name)
+    if _is_stale(path, max_age):
+        with _publish_lock(name):
+            if _is_stale(path, max_age):
+                publish_shared(load(), name)
+    return attach_shared(name)
+
+
+def shares_mapped_memory(df, column):
+    """
+    True if the column's values are a read-only view into the mapped file (no copy).
+    """
+    s = df[column]
+    values = s.cat.codes.to_numpy() if isinstance(s.dtype, pd.CategoricalDtype) else s.to_numpy()
+    return not values.flags.owndata and not values.flags.writeable
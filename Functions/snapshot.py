@@ -0,0 +1,250 @@
+# ----------------------------
+# SNAPSHOT CACHE
+# ----------------------------
+# Keeps the last good copy of every remote CSV export as a Parquet file on disk.
+# A cold process reads the snapshot instead of downloading and parsing the CSV,
+# and only goes back to the remote once the snapshot is older than max_age.
+
+import hashlib
+import io
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# Snapshots live next to the repo (ignored by git)
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_DIR = os.environ.get("WBE_SNAPSHOT_DIR", os.path.join(repo_root, "data_cache"))
+
+# Same as the old st.cache_data TTL
+MAX_SNAPSHOT_AGE = 3600
+
+# Long indicator table: Country Name, Indicator Name, Year, Value
+LONG_SCHEMA = pa.schema([
+    ("Country Name", pa.string()),
+    ("Indicator Name", pa.string()),
+    ("Year", pa.int64()),
+    ("Value", pa.float64()),
+])
+
+# Overview table with the PCA scores per country-year
+OVERVIEW_SCHEMA = pa.schema([
+    ("Country Name", pa.string()),
+    ("Year", pa.int64()),
+    ("score_pca_economics", pa.float64()),
+    ("score_pca_wellbeing", pa.float64()),
+])
+
+
+# ----------------------------
+# Function 1: Fetch + parse the remote CSV
+# ----------------------------
+def fetch_csv(url, etag=None, timeout=30):
+    """
+    Downloads a CSV export. Sends If-None-Match when an ETag is known.
+
+    Returns:
+    - (raw bytes or None if the remote answered 304 Not Modified, new etag)
+    """
+    request = urllib.request.Request(url)
+    if etag:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read(), response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag
+        raise
+
+
+def parse_csv(raw):
+    """
+    Parses raw CSV bytes into a DataFrame with stripped column names.
+    """
+    df = pd.read_csv(io.BytesIO(raw))
+    df.columns = [c.strip() for c in df.columns]
+    return df
+
+
+def check_schema(df, schema):
+    """
+    Raises ValueError if df lacks a column of the schema or a column cannot be
+    cast to its declared type (e.g. an HTML error page parsed as CSV).
+    """
+    if schema is None:
+        return
+    missing = [name for name in schema.names if name not in df.columns]
+    if missing:
+        raise ValueError(f"missing columns: {missing}")
+    try:
+        _to_table(df[schema.names], schema)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(str(e)) from e
+
+
+def content_hash(raw):
+    """
+    Returns the sha256 hex digest of the raw CSV bytes.
+    """
+    return hashlib.sha256(raw).hexdigest()
+
+
+# ----------------------------
+# Function 2: Read / write snapshots
+# ----------------------------
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.parquet")
+
+
+def _to_table(df, schema=None):
+    """
+    Converts a DataFrame to an Arrow table. Columns listed in the schema are cast
+    to their declared type, any extra columns keep their inferred type.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is None:
+        return table
+
+    fields = []
+    for field in table.schema:
+        idx = schema.get_field_index(field.name)
+        fields.append(schema.field(idx) if idx >= 0 else field)
+    return table.cast(pa.schema(fields))
+
+
+def write_snapshot(df, name, schema=None, meta=None):
+    """
+    Writes df to the snapshot store. The file is written next to the target and
+    then renamed, so readers never see a half-written snapshot.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    table = _to_table(df, schema)
+
+    meta = dict(meta or {})
+    meta.setdefault("written_at", time.time())
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"wbe_snapshot": json.dumps(meta).encode("utf-8"),
+    })
+
+    path = snapshot_path(name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot_meta(name):
+    """
+    Returns the metadata dict stored with a snapshot, or None if there is no snapshot.
+    """
+    path = snapshot_path(name)
+    if not os.path.exists(path):
+        return None
+    raw = pq.read_schema(path).metadata or {}
+    meta = json.loads(raw.get(b"wbe_snapshot", b"{}"))
+    meta["age"] = time.time() - os.path.getmtime(path)
+    return meta
+
+
+def read_snapshot(name):
+    """
+    Reads a snapshot back into a DataFrame. Returns None if there is no snapshot.
+    """
+    path = snapshot_path(name)
+    if not os.path.exists(path):
+        return None
+    return pq.read_table(path).to_pandas()
+
+
+# ----------------------------
+# Function 3: Snapshot-first loader
+# ----------------------------
+def load_with_snapshot(url, name, schema=None, max_age=MAX_SNAPSHOT_AGE, timeout=30):
+    """
+    Loads a dataset from its local snapshot and revalidates against the remote
+    only when the snapshot is older than max_age (seconds).
+
+    - fresh snapshot            -> served from disk, no network
+    - stale snapshot, remote ok -> re-downloaded only if the content changed
+    - stale snapshot, remote down -> last good snapshot is served
+    - stale snapshot, download unparsable or off-schema -> last good snapshot is served
+    - no snapshot               -> downloaded, parsed and snapshotted
+
+    Returns:
+    - DataFrame
+    """
+    meta = read_snapshot_meta(name)
+    if meta is not None and meta["age"] < max_age:
+        return read_snapshot(name)
+
+    try:
+        raw, etag = fetch_csv(url, etag=(meta or {}).get("etag"), timeout=timeout)
+    except (urllib.error.URLError, OSError):
+        if meta is not None:
+            return read_snapshot(name)
+        raise
+
+    # 304 Not Modified, or identical bytes: keep the snapshot, just mark it fresh
+    if meta is not None and (raw is None or content_hash(raw) == meta.get("sha256")):
+        os.utime(snapshot_path(name))
+        return read_snapshot(name)
+
+    # A truncated or garbled download must not replace the last good snapshot
+    # (ParserError, EmptyDataError and UnicodeDecodeError are ValueErrors)
+    try:
+        df = parse_csv(raw)
+        check_schema(df, schema)
+    except ValueError:
+        if meta is not None:
+            return read_snapshot(name)
+        raise
+
+    write_snapshot(df, name, schema, meta={
+        "url": url,
+        "etag": etag,
+        "sha256": content_hash(raw),
+    })
+    return read_snapshot(name)
+
+
+# ----------------------------
+# Function 4: Cold-start measurement
+# ----------------------------
+def measure_cold_start(url, name, schema=None, repeat=3):
+    """
+    Compares the old pd.read_csv(url) path with reading the local snapshot.
+    Wall time and parse CPU (process time) are reported as the best of `repeat` runs.
+
+    Returns:
+    - DataFrame with one row per path: ['path', 'wall_ms', 'cpu_ms', 'rows']
+    """
+    def best_of(fn):
+        wall, cpu, rows = [], [], 0
+        for _ in range(repeat):
+            w0, c0 = time.perf_counter(), time.process_time()
+            df = fn()
+            wall.append((time.perf_counter() - w0) * 1000)
+            cpu.append((time.process_time() - c0) * 1000)
+            rows = len(df)
+        return min(wall), min(cpu), rows
+
+    if read_snapshot_meta(name) is None:
+        load_with_snapshot(url, name, schema)
+
+    results = []
+    for path, fn in [
+        ("pd.read_csv(url)", lambda: pd.read_csv(url)),
+        ("snapshot", lambda: read_snapshot(name)),
+    ]:
+        wall_ms, cpu_ms, rows = best_of(fn)
+        results.append({"path": path, "wall_ms": wall_ms, "cpu_ms": cpu_ms, "rows": rows})
+
+    return pd.DataFrame(results)
@@ -0,0 +1,234 @@
+# ----------------------------
+# SQL BACKEND
+# ----------------------------
+# Optional embedded SQL engine over the long indicator table, for ad-hoc
+# analysis without re-writing pandas filter/groupby code in every notebook.
+# Uses DuckDB when it is installed (columnar, reads the Parquet snapshot
+# directly) and falls back to the standard library's SQLite with a covering
+# index on (indicator, country, year, value).
+
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from Functions.interning import VOCABULARIES
+from Functions.snapshot import read_snapshot, snapshot_path
+
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+
+_COLUMNS = {"Country Name": "country", "Indicator Name": "indicator", "Year": "year", "Value": "value"}
+
+
+class IndicatorDB:
+    """
+    In-process SQL database holding one table:
+        indicators(country TEXT, indicator TEXT, year INTEGER, value DOUBLE)
+    Country and indicator names are stored as canonical labels (Functions/interning.py),
+    so "Inflation (CPI))" is queried as "Inflation (CPI, %)".
+
+    Parameters:
+    - source: long DataFrame, or the name of a snapshot (default "indicators")
+    - engine: "duckdb", "sqlite" or "auto" (DuckDB if installed)
+    """
+
+    def __init__(self, source="indicators", engine="auto"):
+        if engine == "auto":
+            engine = "duckdb" if duckdb is not None else "sqlite"
+        if engine == "duckdb" and duckdb is None:
+            raise ImportError("engine='duckdb' needs the duckdb package (pip install duckdb)")
+        self.engine = engine
+        self._lock = threading.Lock()
+
+        if engine == "duckdb":
+            self.conn = duckdb.connect(":memory:")
+            if isinstance(source, str):
+                self.conn.execute(
+                    "CREATE TABLE indicators AS SELECT \"Country Name\" AS country, "
+                    "\"Indicator Name\" AS indicator, CAST(\"Year\" AS INTEGER) AS year, "
+                    "CAST(\"Value\" AS DOUBLE) AS value FROM read_parquet(?)",
+                    [snapshot_path(source)],
+                )
+                self._canonicalize_duckdb()
+            else:
+                frame = _normalize(source)
+                self.conn.register("frame", frame)
+                self.conn.execute("CREATE TABLE indicators AS SELECT * FROM frame")
+                self.conn.unregister("frame")
+            self.conn.execute("CREATE INDEX idx_ind_country_year ON indicators (indicator, country, year)")
+        else:
+            frame = _normalize(read_snapshot(source) if isinstance(source, str) else source)
+            self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE indicators (country TEXT, indicator TEXT, year INTEGER, value REAL)"
+            )
+            self.conn.executemany(
+                "INSERT INTO indicators VALUES (?, ?, ?, ?)",
+                frame.itertuples(index=False, name=None),
+            )
+            # Covering index: lookups never touch the table itself
+            self.conn.execute(
+                "CREATE INDEX idx_ind_country_year ON indicators (indicator, country, year, value)"
+            )
+            self.conn.execute("ANALYZE")
+
+    def _canonicalize_duckdb(self):
+        # Rewrites the labels read straight from Parquet to their canonical form
+        for column, vocabulary in (("country", VOCABULARIES["Country Name"]),
+                                   ("indicator", VOCABULARIES["Indicator Name"])):
+            labels = [row[0] for row in self.conn.execute(
+                f"SELECT DISTINCT {column} FROM indicators WHERE {column} IS NOT NULL").fetchall()]
+            mapping = pd.DataFrame({"label": labels, "canonical": [vocabulary.canonical(label) for label in labels]})
+            mapping = mapping[mapping["label"] != mapping["canonical"]]
+            if len(mapping):
+                self.conn.register("label_map", mapping)
+                self.conn.execute(
+                    f"UPDATE indicators SET {column} = label_map.canonical FROM label_map "
+                    f"WHERE indicators.{column} = label_map.label"
+                )
+                self.conn.unregister("label_map")
+
+    # ----------------------------
+    # Generic query
+    # ----------------------------
+    def query(self, sql, params=()):
+        """
+        Runs any SQL against the `indicators` table and returns a DataFrame.
+        """
+        with self._lock:
+            if self.engine == "duckdb":
+                return self.conn.execute(sql, list(params)).df()
+            return pd.read_sql_query(sql, self.conn, params=list(params))
+
+    # ----------------------------
+    # Query API used by Functions
+    # ----------------------------
+    def series(self, countries, indicator, year_min=None, year_max=None):
+        """
+        Long rows of one indicator for the given countries, sorted by Year,
+        in the layout of filter_data(). Names may be aliases.
+        """
+        countries = [VOCABULARIES["Country Name"].canonical(c) for c in countries]
+        indicator = VOCABULARIES["Indicator Name"].canonical(indicator)
+        if not countries:
+            return pd.DataFrame(columns=list(_COLUMNS))
+        placeholders = ", ".join("?" for _ in countries)
+        sql = (
+            "SELECT country, indicator, year, value FROM indicators "
+            f"WHERE indicator = ? AND country IN ({placeholders}) AND year BETWEEN ? AND ? "
+            "ORDER BY year, country"
+        )
+        params = [indicator, *countries, _lo(year_min), _hi(year_max)]
+        return self.query(sql, params).rename(columns={v: k for k, v in _COLUMNS.items()})
+
+    def means(self, indicators, year_min=None, year_max=None, countries=None):
+        """
+        Mean value per country and indicator over a year window (NULLs ignored).
+
+        Returns:
+        - DataFrame ['Country Name', 'Indicator Name', 'Mean', 'Count']
+        """
+        indicators = [indicators] if isinstance(indicators, str) else list(indicators)
+        indicators = [VOCABULARIES["Indicator Name"].canonical(i) for i in indicators]
+        sql = (
+            "SELECT country, indicator, AVG(value) AS mean, COUNT(value) AS count FROM indicators "
+            f"WHERE indicator IN ({', '.join('?' for _ in indicators)}) AND year BETWEEN ? AND ? "
+        )
+        params = [*indicators, _lo(year_min), _hi(year_max)]
+        if countries is not None:
+            countries = [VOCABULARIES["Country Name"].canonical(c) for c in countries]
+            sql += f"AND country IN ({', '.join('?' for _ in countries)}) "
+            params += countries
+        sql += "GROUP BY country, indicator ORDER BY country, indicator"
+        result = self.query(sql, params)
+        return result.rename(columns={"country": "Country Name", "indicator": "Indicator Name",
+                                      "mean": "Mean", "count": "Count"})
+
+
+def _canonical_labels(values, vocabulary):
+    # Every distinct label is resolved once
+    codes, uniques = pd.factorize(pd.Series(values, copy=False).astype(str))
+    return np.array([vocabulary.canonical(u) for u in uniques], dtype=object)[codes]
+
+
+def _normalize(df):
+    frame = df[list(_COLUMNS)].rename(columns=_COLUMNS)
+    return pd.DataFrame({
+        "country": _canonical_labels(frame["country"], VOCABULARIES["Country Name"]),
+        "indicator": _canonical_labels(frame["indicator"], VOCABULARIES["Indicator Name"]),
+        "year": frame["year"].to_numpy(dtype=np.int64),
+        "value": frame["value"].to_numpy(dtype=np.float64),
+    }).replace({"value": {np.nan: None}})
+
+
+def _lo(year):
+    return -(2 ** 31) if year is None else int(year)
+
+
+def _hi(year):
+    return 2 ** 31 - 1 if year is None else int(year)
+
+
+# ----------------------------
+# Benchmark against the pandas path
+# ----------------------------
+def benchmark_sql_backend(df, scale=100, engines=("auto",), lookups=20):
+    """
+    Enlarges df `scale` times (renamed country copies, roughly WDI size at
+    scale ~ 2000 for the current sheet) and times
+
+    - series: country subset x one indicator x 2000-2023 (plot_indicator_plotly)
+    - means:  per-country mean of one indicator over 2000-2023 (rankings)
+
+    for pandas masks/groupby and each SQL engine.
+
+    Returns:
+    - DataFrame ['engine', 'rows', 'load_s', 'series_ms', 'means_ms']
+    """
+    big = pd.concat(
+        [df] + [df.assign(**{"Country Name": df["Country Name"].astype(str) + f" #{k}"})
+                for k in range(1, scale)],
+        ignore_index=True,
+    )
+    rng = np.random.default_rng(0)
+    countries = big["Country Name"].unique()
+    indicators = big["Indicator Name"].unique()
+    queries = [(list(rng.choice(countries, 10, replace=False)), rng.choice(indicators)) for _ in range(lookups)]
+
+    def timed(fn):
+        t0 = time.perf_counter()
+        for selection, indicator in queries:
+            fn(selection, indicator)
+        return (time.perf_counter() - t0) * 1000 / lookups
+
+    rows = [{
+        "engine": "pandas",
+        "rows": len(big),
+        "load_s": 0.0,
+        "series_ms": timed(lambda cs, ind: big[
+            big["Country Name"].isin(cs) & (big["Indicator Name"] == ind) & big["Year"].between(2000, 2023)
+        ].sort_values("Year")),
+        "means_ms": timed(lambda cs, ind: big[
+            (big["Indicator Name"] == ind) & big["Year"].between(2000, 2023)
+        ].groupby("Country Name")["Value"].mean()),
+    }]
+
+    for engine in engines:
+        t0 = time.perf_counter()
+        db = IndicatorDB(big, engine=engine)
+        load_s = time.perf_counter() - t0
+        rows.append({
+            "engine": db.engine,
+            "rows": len(big),
+            "load_s": load_s,
+            "series_ms": timed(lambda cs, ind: db.series(cs, ind, 2000, 2023)),
+            "means_ms": timed(lambda cs, ind: db.means(ind, 2000, 2023)),
+        })
+
+    return pd.DataFrame(rows)
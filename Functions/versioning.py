@@ -0,0 +1,58 @@
+# ----------------------------
+# DATASET VERSIONS
+# ----------------------------
+# A dataset version is a short content hash of a DataFrame. Streamlit caches for
+# derived objects (filtered frames, rankings, figures) take the version as their
+# first argument and the DataFrame itself as an unhashed `_df` argument, so they
+# are invalidated only when the data actually changes.
+
+import hashlib
+import weakref
+
+import pandas as pd
+
+
+# id(df) -> version of frames registered with register_version() (the frames
+# served by Functions/registry.py); entries are dropped when the DataFrame is
+# garbage collected. (df.attrs is not used on purpose: pandas copies attrs onto
+# every derived frame.)
+_versions = {}
+
+
+def _content_hash(df):
+    h = hashlib.sha1()
+    h.update(repr([(c, str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+def register_version(df, version=None):
+    """
+    Records the version of a loaded dataset (default: its content hash), so
+    dataset_version() is free for it afterwards. Registered frames are shared
+    by every session and must be treated as read-only: an in-place edit is not
+    seen by the version.
+    """
+    key = id(df)
+    if key not in _versions:
+        _versions[key] = version or _content_hash(df)
+        weakref.finalize(df, _versions.pop, key, None)
+    return _versions[key]
+
+
+def registered_version(df):
+    """
+    Version recorded by register_version(), or None for any other frame.
+    """
+    return None if df is None else _versions.get(id(df))
+
+
+def dataset_version(df):
+    """
+    Returns a content hash for df (column names, dtypes and values): the
+    recorded version for registered datasets, otherwise hashed on every call.
+    """
+    if df is None:
+        return None
+    version = registered_version(df)
+    return version if version is not None else _content_hash(df)
@@ -0,0 +1,70 @@
+# ----------------------------
+# WINDOW AGGREGATES
+# ----------------------------
+# Per-country cumulative sums and counts over years for the score columns.
+# The NaN-aware mean of any year window is then
+#     (csum[end] - csum[start]) / (ccount[end] - ccount[start])
+# i.e. O(1) per country and no groupby when the user moves the year slider.
+
+import numpy as np
+import pandas as pd
+
+
+class WindowAggregates:
+    """
+    csum[c, y, k] / ccount[c, y, k]: sum / number of non-NaN values of column k
+    for country c over the years before years[0] + y.
+    """
+
+    def __init__(self, df, value_columns, country_col="Country Name", year_col="Year"):
+        # Rows without a country would get factorize code -1, which np.add.at
+        # would add to the last country
+        df = df[df[year_col].notna() & df[country_col].notna()]
+        self.value_columns = list(value_columns)
+        self.country_col = country_col
+
+        c_codes, countries = pd.factorize(df[country_col], sort=True)
+        year_values = df[year_col].to_numpy(dtype=np.int64)
+        self.countries = np.asarray(countries, dtype=object)
+        self.first_year = int(year_values.min()) if len(year_values) else 0
+        self.last_year = int(year_values.max()) if len(year_values) else -1
+        n_years = self.last_year - self.first_year + 1
+
+        # Dense country x year x column grid (duplicates are summed and counted)
+        values = df[self.value_columns].to_numpy(dtype=np.float64)
+        has_value = ~np.isnan(values)
+        sums = np.zeros((len(countries), n_years, len(self.value_columns)))
+        counts = np.zeros((len(countries), n_years, len(self.value_columns)), dtype=np.int64)
+        np.add.at(sums, (c_codes, year_values - self.first_year), np.where(has_value, values, 0.0))
+        np.add.at(counts, (c_codes, year_values - self.first_year), has_value)
+
+        # Leading zero row so a window is csum[hi] - csum[lo]
+        pad = ((0, 0), (1, 0), (0, 0))
+        self.csum = np.pad(np.cumsum(sums, axis=1), pad)
+        self.ccount = np.pad(np.cumsum(counts, axis=1), pad)
+
+    def _bounds(self, year_min, year_max):
+        lo = 0 if year_min is None else int(np.clip(year_min - self.first_year, 0, self.csum.shape[1] - 1))
+        hi = self.csum.shape[1] - 1 if year_max is None else \
+            int(np.clip(year_max - self.first_year + 1, 0, self.csum.shape[1] - 1))
+        return lo, max(lo, hi)
+
+    def window_means(self, year_min=None, year_max=None, countries=None):
+        """
+        Mean of every value column per country over [year_min, year_max]
+        (NaNs ignored; NaN where a country has no value in the window).
+
+        Returns:
+        - DataFrame [country_col] + value_columns, one row per country
+        """
+        lo, hi = self._bounds(year_min, year_max)
+        sums = self.csum[:, hi] - self.csum[:, lo]
+        counts = self.ccount[:, hi] - self.ccount[:, lo]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+        result = pd.DataFrame(means, columns=self.value_columns)
+        result.insert(0, self.country_col, self.countries)
+        if countries is not None:
+            result = result[result[self.country_col].isin(countries)].reset_index(drop=True)
+        return result
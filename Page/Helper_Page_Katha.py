@@ -27,6 +27,7 @@ from Functions.functions import (
     plot_esi_ranking_bar,
     plot_esi_wti_quadrants
 )
+from Functions.registry import load_dataset
 
 # -----------------------------------
 # PAGE CONFIG
@@ -241,16 +242,12 @@ st.markdown("""
 # -----------------------------------
 # LOAD DATA ONCE (GLOBAL) - WITH CACHING FOR FASTER LOAD
 # -----------------------------------
-df_url = "https://docs.google.com/spreadsheets/d/1E0lyCSxlC0ajNtzjpWo17TX5DEeEjd33E-j6c7fOBcg/export?format=csv"
-df_overview_url = "https://docs.google.com/spreadsheets/d/1JRp5v_2U4HMxl3aB_UZF7MHHPn3o0cAHSgn0ZeuFrvE/export?format=csv&gid=235949117"
-
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+# Datasets are defined once in Functions/registry.py and shared by all pages
 def load_data():
-    return pd.read_csv(df_url)
+    return load_dataset("indicators")
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def load_overview_data():
-    return pd.read_csv(df_overview_url)
+    return load_dataset("overview_alt")
 
 # Show loading spinner
 with st.spinner('Loading data...'):
@@ -262,13 +259,6 @@ with st.spinner('Loading data...'):
         df_overview = None
         st.error(f"Could not load the dataset: {e}")
 
-# Clean column names
-if df is not None:
-    df.columns = [c.strip() for c in df.columns]
-    
-if df_overview is not None:
-    df_overview.columns = [c.strip() for c in df_overview.columns]
-
 # -----------------------------------
 # HEADER
 # -----------------------------------
@@ -481,8 +471,8 @@ elif selected_tab == "Deep Dive":
             st.plotly_chart(fig2, use_container_width=True)
             st.write("")
             
-            # 3. Inflation (CPI, %))
-            fig3 = plot_indicator_plotly(df, selected_countries, "Inflation (CPI, %))")
+            # 3. Inflation (CPI, %)
+            fig3 = plot_indicator_plotly(df, selected_countries, "Inflation (CPI, %)")
             st.plotly_chart(fig3, use_container_width=True)
         
         # WELL-BEING INDICATORS (Right Column)
@@ -28,6 +28,7 @@ from Functions.functions import (
     plot_esi_wti_quadrants,
     display_streamlit_methodology
 )
+from Functions.registry import load_dataset
 
 # -----------------------------------
 # PAGE CONFIG
@@ -262,16 +263,12 @@ st.markdown("""
 # -----------------------------------
 # LOAD DATA ONCE (GLOBAL) - WITH CACHING FOR FASTER LOAD
 # -----------------------------------
-df_url = "https://docs.google.com/spreadsheets/d/1E0lyCSxlC0ajNtzjpWo17TX5DEeEjd33E-j6c7fOBcg/export?format=csv"
-df_overview_url = "https://docs.google.com/spreadsheets/d/1JRp5v_2U4HMxl3aB_UZF7MHHPn3o0cAHSgn0ZeuFrvE/export?format=csv&gid=235949117"
-
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+# Datasets are defined once in Functions/registry.py and shared by all pages
 def load_data():
-    return pd.read_csv(df_url)
+    return load_dataset("indicators")
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def load_overview_data():
-    return pd.read_csv(df_overview_url)
+    return load_dataset("overview_alt")
 
 # Show loading spinner
 with st.spinner('Loading data...'):
@@ -283,13 +280,6 @@ with st.spinner('Loading data...'):
         df_overview = None
         st.error(f"Could not load the dataset: {e}")
 
-# Clean column names
-if df is not None:
-    df.columns = [c.strip() for c in df.columns]
-    
-if df_overview is not None:
-    df_overview.columns = [c.strip() for c in df_overview.columns]
-
 # -----------------------------------
 # HEADER
 # -----------------------------------
@@ -498,7 +488,7 @@ elif selected_tab == "Analytical Insights":
         economic_indicators = [
             "GDP per capita",
             "Unemployment levels (%)",
-            "Inflation (CPI, %))"
+            "Inflation (CPI, %)"
         ]
         
         wellbeing_indicators = [
@@ -27,10 +27,7 @@ from Functions.functions import (
     plot_esi_ranking_bar,
     plot_esi_wti_quadrants
 )
-
-st.cache_data.clear()  # clears cached data
-st.cache_resource.clear()  # clears cached models/resources
-
+from Functions.registry import load_dataset
 
 # -----------------------------------
 # PAGE CONFIG
@@ -274,17 +271,12 @@ st.markdown("""
 # -----------------------------------
 # LOAD DATA ONCE (GLOBAL) - WITH CACHING FOR FASTER LOAD
 # -----------------------------------
-df_url = "https://docs.google.com/spreadsheets/d/1E0lyCSxlC0ajNtzjpWo17TX5DEeEjd33E-j6c7fOBcg/export?format=csv"
-df_overview_url = "https://docs.google.com/spreadsheets/d/1M8VQzniWDbRQIgaQ6bmgylWPGtMc3dBzPnQWxwBJPqU/export?format=csv&gid=147164817"
-
-
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+# Datasets are defined once in Functions/registry.py and shared by all pages
 def load_data():
-    return pd.read_csv(df_url)
+    return load_dataset("indicators")
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def load_overview_data():
-    return pd.read_csv(df_overview_url)
+    return load_dataset("overview")
 
 # Show loading spinner
 with st.spinner('Loading data...'):
@@ -296,13 +288,6 @@ with st.spinner('Loading data...'):
         df_overview = None
         st.error(f"Could not load the dataset: {e}")
 
-# Clean column names
-if df is not None:
-    df.columns = [c.strip() for c in df.columns]
-    
-if df_overview is not None:
-    df_overview.columns = [c.strip() for c in df_overview.columns]
-
 
 
 
@@ -528,7 +513,7 @@ elif selected_tab == "Analytical Insights":
         economic_indicators = [
             "GDP per capita",
             "Unemployment levels (%)",
-            "Inflation (CPI, %))"
+            "Inflation (CPI, %)"
         ]
         
         wellbeing_indicators = [
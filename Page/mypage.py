@@ -25,12 +25,17 @@ from Functions.functions import (
     plot_indicator_plotly,
     plot_pca_scores_plotly,
     plot_esi_ranking_bar,
-    plot_esi_wti_quadrants
+    plot_esi_wti_quadrants,
+    interval_error_bars
 )
-
-st.cache_data.clear()  # clears cached data
-st.cache_resource.clear()  # clears cached models/resources
-
+from Functions.registry import load_dataset
+from Functions.versioning import dataset_version
+from Functions.panel import PanelCube
+from Functions.window_aggregates import WindowAggregates
+from Functions.ranking import RankingEngine
+from Functions.indexing import YEAR_RANGE
+from Functions.result_cache import RESULT_CACHE, canonical_key
+from Functions.index_bootstrap import bootstrap_indices, window_intervals
 
 # -----------------------------------
 # PAGE CONFIG
@@ -274,17 +279,14 @@ st.markdown("""
 # -----------------------------------
 # LOAD DATA ONCE (GLOBAL) - WITH CACHING FOR FASTER LOAD
 # -----------------------------------
-df_url = "https://docs.google.com/spreadsheets/d/1E0lyCSxlC0ajNtzjpWo17TX5DEeEjd33E-j6c7fOBcg/export?format=csv"
-df_overview_url = "https://docs.google.com/spreadsheets/d/1M8VQzniWDbRQIgaQ6bmgylWPGtMc3dBzPnQWxwBJPqU/export?format=csv&gid=147164817"
-
-
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+# Datasets are defined once in Functions/registry.py and shared by all pages:
+# served from the local Parquet snapshot (data_cache/), refreshed by a single
+# background thread per process once they are older than 1 hour.
 def load_data():
-    return pd.read_csv(df_url)
+    return load_dataset("indicators")
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def load_overview_data():
-    return pd.read_csv(df_overview_url)
+    return load_dataset("overview")
 
 # Show loading spinner
 with st.spinner('Loading data...'):
@@ -296,12 +298,80 @@ with st.spinner('Loading data...'):
         df_overview = None
         st.error(f"Could not load the dataset: {e}")
 
-# Clean column names
-if df is not None:
-    df.columns = [c.strip() for c in df.columns]
-    
-if df_overview is not None:
-    df_overview.columns = [c.strip() for c in df_overview.columns]
+# Dataset versions (content hashes) - all derived caches below are keyed by these,
+# so they only recompute when the underlying data actually changes
+df_version = dataset_version(df)
+df_overview_version = dataset_version(df_overview)
+
+
+# -----------------------------------
+# VERSIONED CACHES FOR DERIVED DATA
+# (arguments starting with "_" are not hashed by Streamlit)
+# -----------------------------------
+@st.cache_resource(max_entries=4)
+def get_window_aggregates(version, _df_overview):
+    # Per-country cumulative sums/counts over years, built once per dataset version
+    return WindowAggregates(_df_overview, ['score_pca_economics', 'score_pca_wellbeing'])
+
+def get_window_means(version, _df_overview, countries, years):
+    def compute():
+        # O(1) per country for any year window - no groupby per interaction
+        means = get_window_aggregates(version, _df_overview).window_means(years[0], years[1], countries)
+        # Rename columns to match the function expectations
+        return means.rename(columns={
+            'score_pca_economics': 'Economic Success (PCA)',
+            'score_pca_wellbeing': 'Well-Being (PCA)'
+        })
+    # Shared across sessions, LRU under a byte budget
+    return RESULT_CACHE.get_or_compute(canonical_key("window_means", version, countries, years=years), compute)
+
+def get_previous_window_means(version, _df_overview, countries, years):
+    # Window of the same length just before the selected one (None if it starts before the data)
+    width = years[1] - years[0] + 1
+    if years[0] - width < int(_df_overview['Year'].min()):
+        return None
+    return get_window_means(version, _df_overview, countries, (years[0] - width, years[0] - 1))
+
+@st.cache_data(max_entries=128)
+def get_esi_ranking_figure(version, _df_overview, countries, years):
+    averages = get_window_means(version, _df_overview, countries, years)
+    previous = get_previous_window_means(version, _df_overview, countries, years)
+    return plot_esi_ranking_bar(None, top_n=0, bottom_n=0, averages=averages, previous_averages=previous)
+
+@st.cache_data(max_entries=128)
+def get_wbi_ranking(version, _df_overview, countries, years):
+    column = 'Well-Being (PCA)'
+    previous = get_previous_window_means(version, _df_overview, countries, years)
+    df_ranking = RankingEngine.from_frame(get_window_means(version, _df_overview, countries, years), column).rank(
+        column, previous=None if previous is None else previous[['Country Name', column]]
+    )
+    return df_ranking.rename(columns={column: 'Avg_WTI'})
+
+@st.cache_data(max_entries=128)
+def get_quadrant_figure(version, _df_overview, countries, years):
+    return plot_esi_wti_quadrants(None, averages=get_window_means(version, _df_overview, countries, years))
+
+@st.cache_resource(max_entries=4)
+def get_bootstrap(version, _df):
+    # EI / WBI refitted on bootstrap resamples, once per dataset version. Inline
+    # (workers=1): no process pool forked from the multithreaded server, and at
+    # this panel size the pool is slower anyway
+    return bootstrap_indices(_df, workers=1)
+
+def get_index_intervals(version, _df, countries, years):
+    # Per-country 90% intervals + quadrant probabilities of the recomputed indices
+    def compute():
+        return window_intervals(get_bootstrap(version, _df), years, countries)
+    return RESULT_CACHE.get_or_compute(canonical_key("index_intervals", version, countries, years=years), compute)
+
+@st.cache_resource(max_entries=4)
+def get_panel_cube(version, _df):
+    # Dense country x indicator x year array, built once per dataset version
+    return PanelCube.from_long(_df)
+
+@st.cache_data(max_entries=256)
+def get_indicator_figure(version, _df, countries, indicator):
+    return plot_indicator_plotly(get_panel_cube(version, _df), list(countries), indicator)
 
 
 
@@ -381,14 +451,27 @@ if selected_tab == "Overview":
     st.write("---")
 
     if df_overview is not None and len(selected_countries) > 0:
-        # Filter data for selected countries
-        df_filtered = df_overview[df_overview['Country Name'].isin(selected_countries)]
+        # Cache key: dataset version + order-independent country selection + year window
+        countries_key = tuple(sorted(selected_countries))
         
-        # Rename columns to match the function expectations
-        df_filtered_renamed = df_filtered.rename(columns={
-            'score_pca_economics': 'Economic Success (PCA)',
-            'score_pca_wellbeing': 'Well-Being (PCA)'
-        })
+        first_year, last_year = int(df_overview['Year'].min()), int(df_overview['Year'].max())
+        col_years, col_years_empty = st.columns([0.6, 0.4])
+        with col_years:
+            years_key = st.slider(
+                "📅 Average over years",
+                min_value=first_year,
+                max_value=last_year,
+                value=(max(first_year, YEAR_RANGE[0]), min(last_year, YEAR_RANGE[1])),
+                key="overview_years"
+            )
+        years_label = f"{years_key[0]}-{years_key[1]}"
+
+        # Bootstrap 90% intervals around the displayed averages (widths from the indices
+        # recomputed on resampled indicator data)
+        show_uncertainty = df is not None and col_years.checkbox(
+            "Show uncertainty (bootstrap, 90% intervals)", key="overview_uncertainty"
+        )
+        intervals = get_index_intervals(df_version, df, countries_key, years_key) if show_uncertainty else None
         
         st.write("")
         
@@ -397,7 +480,14 @@ if selected_tab == "Overview":
         
         with col1:
             st.markdown("### Economic Index (EI)")
-            fig_esi = plot_esi_ranking_bar(df_filtered_renamed, top_n=0, bottom_n=0)
+            if intervals is not None:
+                fig_esi = plot_esi_ranking_bar(
+                    None, averages=get_window_means(df_overview_version, df_overview, countries_key, years_key),
+                    previous_averages=get_previous_window_means(df_overview_version, df_overview, countries_key, years_key),
+                    intervals=intervals
+                )
+            else:
+                fig_esi = get_esi_ranking_figure(df_overview_version, df_overview, countries_key, years_key)
             
             # Update styling to match Deep Dive charts
             fig_esi.update_layout(
@@ -405,7 +495,7 @@ if selected_tab == "Overview":
                 paper_bgcolor='rgba(0,0,0,0)',
                 font=dict(color='#e0e0e0', size=12),
                 title=dict(
-                    text='Country Ranking: Economic Index (EI, 2000-2023 Average)',
+                    text=f'Country Ranking: Economic Index (EI, {years_label} Average)',
                     font=dict(size=16, color='#ffffff')
                 ),
                 xaxis=dict(
@@ -422,9 +512,12 @@ if selected_tab == "Overview":
         with col2:
             st.markdown("### Well-Being Index (WBI)")
             # Create a version of the function for well-being
-            df_ranking = df_filtered_renamed.groupby('Country Name')['Well-Being (PCA)'].mean().reset_index()
-            df_ranking.rename(columns={'Well-Being (PCA)': 'Avg_WTI'}, inplace=True)
-            df_ranking_sorted = df_ranking.sort_values(by='Avg_WTI', ascending=False).reset_index(drop=True)
+            df_ranking_sorted = get_wbi_ranking(df_overview_version, df_overview, countries_key, years_key)
+            wbi_error_bars = {}
+            if intervals is not None:
+                df_ranking_sorted, wbi_error_bars = interval_error_bars(
+                    df_ranking_sorted, intervals, 'Avg_WTI', 'Well-Being (PCA)'
+                )
             
             import plotly.express as px
             fig_wti = px.bar(
@@ -434,8 +527,10 @@ if selected_tab == "Overview":
                 orientation='h', 
                 color='Avg_WTI',
                 color_continuous_scale=px.colors.sequential.Teal,
-                title='Country Ranking: Well-Being Index (WBI, 2000-2023 Average)',
-                labels={'Avg_WTI': 'WBI', 'Country Name': ''}
+                title=f'Country Ranking: Well-Being Index (WBI, {years_label} Average)',
+                labels={'Avg_WTI': 'WBI', 'Country Name': ''},
+                hover_data=[c for c in ('Rank', 'Rank Change') if c in df_ranking_sorted.columns],
+                **wbi_error_bars
             )
             
             sorted_country_list = df_ranking_sorted['Country Name'].tolist()
@@ -467,14 +562,23 @@ if selected_tab == "Overview":
         st.markdown("### Quadrant Analysis: Economic Prosperity vs. Well-Being") 
         st.write("")
         
-        fig_quadrant = plot_esi_wti_quadrants(df_filtered_renamed)
+        if intervals is not None:
+            fig_quadrant = plot_esi_wti_quadrants(
+                None, averages=get_window_means(df_overview_version, df_overview, countries_key, years_key),
+                intervals=intervals
+            )
+        else:
+            fig_quadrant = get_quadrant_figure(df_overview_version, df_overview, countries_key, years_key)
         
         # Update styling to match Deep Dive charts - FIXED
         fig_quadrant.update_layout(
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
             font=dict(color='#e0e0e0', size=12),
-            title=dict(font=dict(size=16, color='#ffffff')),
+            title=dict(
+                text=f'EI vs. WBI Quadrant Analysis (Average {years_label})',
+                font=dict(size=16, color='#ffffff')
+            ),
             xaxis=dict(
                 gridcolor='rgba(255,255,255,0.1)',
                 zerolinecolor='rgba(255,255,255,0.2)',
@@ -536,7 +640,7 @@ elif selected_tab == "Analytical Insights":
         economic_indicators = [
             "GDP per capita",
             "Unemployment levels (%)",
-            "Inflation (CPI, %))"
+            "Inflation (CPI, %)"
         ]
         
         wellbeing_indicators = [
@@ -554,7 +658,7 @@ elif selected_tab == "Analytical Insights":
                 key="economic_selector"
             )
             
-            fig_econ = plot_indicator_plotly(df, selected_countries, selected_economic)
+            fig_econ = get_indicator_figure(df_version, df, tuple(selected_countries), selected_economic)
             st.plotly_chart(fig_econ, use_container_width=True, key="economic_chart")
         
         # WELL-BEING INDICATORS (Right Column)
@@ -567,7 +671,7 @@ elif selected_tab == "Analytical Insights":
                 key="wellbeing_selector"
             )
             
-            fig_well = plot_indicator_plotly(df, selected_countries, selected_wellbeing)
+            fig_well = get_indicator_figure(df_version, df, tuple(selected_countries), selected_wellbeing)
             st.plotly_chart(fig_well, use_container_width=True, key="wellbeing_chart")
             
     elif len(selected_countries) == 0:
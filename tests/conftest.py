@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Same import setup as the pages: the repository root on the search path
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+
+
+@pytest.fixture(scope="session")
+def long_df():
+    """
+    The long indicator table of the notebooks (raw sheet labels).
+    """
+    df = pd.read_csv(os.path.join(repo_root, "Notebooks", "Full_country_list.csv"))
+    df.columns = [c.strip() for c in df.columns]
+    return df
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from Functions.bulk import WEO_SPEC, build_long_store, build_wide_store, open_long_store, read_wide_store
+
+
+def test_build_long_store_rerun_replaces_store(tmp_path):
+    csv = tmp_path / "wide.csv"
+    pd.DataFrame({
+        "Country Name": ["Chile", "Japan", "Chile"],
+        "Indicator Name": ["Gini index", "Gini index", "GDP per capita"],
+        "2000": [1.0, 2.0, 3.0],
+        "2001": [4.0, 5.0, None],
+    }).to_csv(csv, index=False)
+    store = tmp_path / "store"
+
+    # chunksize=1: one country's rows arrive in several chunks
+    first = build_long_store(csv, store, chunksize=1)
+    second = build_long_store(csv, store, chunksize=1)
+    assert first == second == 5
+    assert open_long_store(store).count_rows() == 5
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["store", "wide.csv"]
+
+
+def test_weo_descriptor_is_split_by_units(tmp_path):
+    tsv = tmp_path / "weo.xls"
+    pd.DataFrame({
+        "Country": ["Chile", "Chile"],
+        "Subject Descriptor": ["Gross domestic product, current prices"] * 2,
+        "Units": ["National currency", "U.S. dollars"],
+        "2000": ["40,393.41", "77.86"],
+        "2001": ["43,072.44", "71.35"],
+    }).to_csv(tsv, sep="\t", index=False, encoding="latin-1")
+    store, wide_dir = tmp_path / "store", tmp_path / "wide"
+
+    assert build_long_store(tsv, store, spec=WEO_SPEC) == 4
+    long_df = open_long_store(store).to_table().to_pandas()
+    assert not long_df.duplicated(["Country Name", "Indicator Name", "Year"]).any()
+
+    build_wide_store(store, wide_dir)
+    wide = read_wide_store(wide_dir)
+    assert wide["Gross domestic product, current prices (National currency)"].tolist() == [40393.41, 43072.44]
+    assert wide["Gross domestic product, current prices (U.S. dollars)"].tolist() == [77.86, 71.35]
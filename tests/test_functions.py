@@ -0,0 +1,44 @@
+import numpy as np
+
+from Functions.functions import filter_data
+from Functions.panel import PanelCube
+from Functions.versioning import dataset_version, register_version
+
+
+def test_filter_data_sees_in_place_edits(long_df):
+    df = long_df.copy()
+    gdp = (df["Country Name"] == "Chile") & (df["Indicator Name"] == "GDP per capita")
+    filter_data(df, "Chile", "GDP per capita")
+    version = dataset_version(df)
+
+    df.loc[gdp, "Value"] = -1.0
+    assert (filter_data(df, "Chile", "GDP per capita")["Value"] == -1.0).all()
+    assert dataset_version(df) != version
+
+
+def test_filter_data_result_is_a_copy(long_df):
+    df = long_df.copy()
+    register_version(df)
+    first = filter_data(df, "Chile", "GDP per capita")
+    first["Value"] = np.nan
+    assert filter_data(df, "Chile", "GDP per capita")["Value"].notna().any()
+
+
+def test_filter_data_panel_cube_matches_dataframe(long_df):
+    cube = PanelCube.from_long(long_df)
+    pairs = long_df[["Country Name", "Indicator Name"]].drop_duplicates().itertuples(index=False)
+    for country, indicator in pairs:
+        expected = filter_data(long_df, country, indicator)
+        result = filter_data(cube, country, indicator)
+        assert len(result) == len(expected), (country, indicator)
+        np.testing.assert_array_equal(result["Year"].to_numpy(), expected["Year"].to_numpy())
+        np.testing.assert_array_equal(result["Value"].to_numpy(), expected["Value"].to_numpy())
+
+
+def test_panel_cube_skips_rows_without_labels(long_df):
+    df = long_df.copy()
+    df.loc[df.index[:5], "Country Name"] = None
+    cube = PanelCube.from_long(df)
+    assert list(cube.countries) == sorted(df["Country Name"].dropna().unique())
+    assert cube.present.sum() == len(df.dropna(subset=["Country Name"]).drop_duplicates(
+        ["Country Name", "Indicator Name", "Year"]))
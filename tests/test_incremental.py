@@ -0,0 +1,31 @@
+import pytest
+
+from Functions import incremental, snapshot
+from Functions.incremental import ingest_incremental
+from Functions.snapshot import LONG_SCHEMA, read_snapshot, write_snapshot
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(incremental, "SNAPSHOT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_ingest_keeps_refreshed_snapshot_untouched(long_df, snapshot_dir):
+    base = long_df[long_df["Year"] < 2020]
+    write_snapshot(base, "indicators", LONG_SCHEMA)
+
+    changes = ingest_incremental(long_df, log_changes=False)
+    assert len(changes["inserted"]) == len(long_df) - len(base)
+
+    # A refresh rewriting "indicators" from the remote does not lose the upserts
+    write_snapshot(base, "indicators", LONG_SCHEMA)
+    assert len(read_snapshot("indicators")) == len(base)
+    assert len(read_snapshot("indicators_incremental")) == len(long_df)
+    assert ingest_incremental(long_df, log_changes=False)["inserted"].empty
+
+
+def test_ingest_into_refreshed_snapshot_is_refused(long_df, snapshot_dir):
+    with pytest.raises(ValueError):
+        ingest_incremental(long_df, name="indicators")
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from Functions.index_bootstrap import QUADRANTS, bootstrap_indices, score_bands, window_intervals
+
+
+@pytest.fixture(scope="module")
+def result(long_df):
+    return bootstrap_indices(long_df, replicates=300, seed=3, workers=1)
+
+
+def test_replicates_do_not_depend_on_workers(long_df, result):
+    pooled = bootstrap_indices(long_df, replicates=300, seed=3, workers=2)
+    assert result.replicates.keys() == pooled.replicates.keys()
+    for column, draws in result.replicates.items():
+        assert draws.shape == (300, len(result.scores))
+        np.testing.assert_array_equal(pooled.replicates[column], draws)
+
+
+def test_quadrant_probabilities_sum_to_one(result):
+    intervals = window_intervals(result, year_range=(2010, 2020))
+    probabilities = intervals[[f"P({quadrant})" for quadrant in QUADRANTS]].to_numpy()
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+    assert intervals["Quadrant probability"].between(0, 1).all()
+
+
+def test_bands_contain_the_point_estimate(result):
+    bands = score_bands(result)
+    for column in result.replicates:
+        rows = bands[column].notna()
+        assert rows.any()
+        assert (bands.loc[rows, f"{column} low"] <= bands.loc[rows, column]).all(), column
+        assert (bands.loc[rows, column] <= bands.loc[rows, f"{column} high"]).all(), column
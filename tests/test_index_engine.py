@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Functions.index_engine import INDEX_DEFINITIONS, compute_index
+
+
+@pytest.fixture
+def small_long_df():
+    """
+    Five countries x 1999-2004 with gaps that need the per-country ffill / bfill.
+    """
+    rng = np.random.default_rng(7)
+    indicators = list(INDEX_DEFINITIONS["EI"]["indicators"]) + ["Gini index"]
+    rows = [(c, i, y, rng.normal(10, 3)) for c in ["Chile", "Japan", "Poland", "Germany", "Ghana"]
+            for i in indicators for y in range(1999, 2005)]
+    df = pd.DataFrame(rows, columns=["Country Name", "Indicator Name", "Year", "Value"])
+
+    def drop(country, indicator, years):
+        df.drop(df.index[(df["Country Name"] == country) & df["Indicator Name"].isin(indicator)
+                         & df["Year"].isin(years)], inplace=True)
+
+    drop("Chile", ["GDP per capita"], [1999, 2000])  # bfill from 2001
+    drop("Japan", ["Inflation (CPI, %)"], [2003])  # ffill from 2002
+    drop("Poland", ["Unemployment levels (%)"], [1999, 2000, 2001])  # bfill over two years
+    drop("Germany", indicators[:3], [2004])  # row only from Gini, ffilled
+    return df.reset_index(drop=True)
+
+
+def _notebook_index(df, definition, year_range, exclude):
+    # The notebook's steps: pivot, ffill/bfill per country, recode, z-scores, PC1
+    indicators = definition["indicators"]
+    df = df[df["Year"].between(*year_range) & ~df["Country Name"].isin(exclude)]
+    wide = df.pivot_table(index=["Country Name", "Year"], columns="Indicator Name", values="Value")
+    wide = wide.groupby(level="Country Name").ffill().groupby(level="Country Name").bfill()
+    X = wide[list(indicators)].dropna()
+    X = X * pd.Series(indicators)
+    Z = (X - X.mean()) / X.std(ddof=0)
+    eigenvalues, eigenvectors = np.linalg.eigh(np.cov(Z.to_numpy().T, bias=True))
+    pc1 = eigenvectors[:, -1] * (1 if eigenvectors[:, -1].sum() >= 0 else -1)
+    return pd.Series(Z.to_numpy() @ pc1, index=X.index), eigenvalues[-1] / eigenvalues.sum()
+
+
+def test_compute_index_matches_the_notebook_steps(small_long_df):
+    definition = INDEX_DEFINITIONS["EI"]
+    result = compute_index(small_long_df, "EI", year_range=(2000, 2004), exclude=("Ghana",))
+    expected, ratio = _notebook_index(small_long_df, definition, (2000, 2004), ("Ghana",))
+
+    scores = result.scores.set_index(["Country Name", "Year"])[definition["score_column"]]
+    assert len(scores) == len(expected) == 20
+    np.testing.assert_allclose(scores.sort_index().to_numpy(), expected.sort_index().to_numpy(), atol=1e-9)
+    np.testing.assert_allclose(result.explained_variance_ratio[0], ratio)
+
+    # The filled cells come from the same country
+    chile = small_long_df[(small_long_df["Country Name"] == "Chile")
+                          & (small_long_df["Indicator Name"] == "GDP per capita")]
+    assert ("Chile", 2000) in scores.index and chile["Year"].min() == 2001
+    assert ("Germany", 2004) in scores.index
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from Functions.incremental import apply_delta, compute_delta
+from Functions.index_engine import INDEX_DEFINITIONS
+from Functions.index_incremental import IncrementalIndex, compare_with_refit
+
+
+def _previous_release(df):
+    """
+    The table before a release: Japan's last year missing, some Chile / Denmark values different.
+    """
+    previous = df[~((df["Country Name"] == "Japan") & (df["Year"] == 2023))].copy()
+    revised = previous["Country Name"].isin(["Chile", "Denmark"]) & previous["Year"].between(2010, 2015)
+    previous.loc[revised, "Value"] = previous.loc[revised, "Value"] * 1.1
+    return previous.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("index", list(INDEX_DEFINITIONS))
+def test_update_matches_refit(long_df, index):
+    previous = _previous_release(long_df)
+    changes = compute_delta(previous, long_df)
+    assert len(changes["inserted"]) and len(changes["updated"])
+
+    incremental = IncrementalIndex(index).fit(previous)
+    incremental.update(changes=changes)
+
+    current = apply_delta(previous, changes)
+    diff = compare_with_refit(incremental, current)
+    assert diff["rows_missing"] == 0
+    assert diff["loadings"] < 1e-9
+    assert diff["explained_variance_ratio"] < 1e-9
+    assert diff["scores"] < 1e-9
+
+
+def test_update_reads_only_the_delta(long_df, monkeypatch):
+    previous = _previous_release(long_df)
+    changes = compute_delta(previous, long_df)
+    incremental = IncrementalIndex("EI").fit(previous)
+
+    seen = []
+    original = IncrementalIndex._country_rows
+    monkeypatch.setattr(IncrementalIndex, "_country_rows",
+                        lambda self, df: seen.append(len(df)) or original(self, df))
+    incremental.update(changes=changes)
+    touched = pd.unique(changes["inserted"]["Country Name"].astype(str)).tolist() + \
+        pd.unique(changes["updated"]["Country Name"].astype(str)).tolist()
+    assert seen and seen[0] == sum(len(incremental.source[c]) for c in set(touched))
+    assert seen[0] < len(long_df) / 2
@@ -0,0 +1,24 @@
+import numpy as np
+
+from Functions.index_engine import INDEX_DEFINITIONS
+from Functions.index_rolling import align_signs, rolling_index
+
+
+def test_align_signs_follows_previous_window():
+    components = np.array([[-1.0, 0.0], [-1.0, 0.1], [-1.0, 0.2]])
+    # First window flipped to a positive sum, the others follow it
+    assert align_signs(components).tolist() == [-1.0, -1.0, -1.0]
+
+
+def test_align_signs_flips_back_and_forth():
+    components = np.array([[1.0, 0.2], [-1.0, -0.1], [1.0, 0.0], [-1.0, 0.3]])
+    aligned = components * align_signs(components)[:, None]
+    assert (np.einsum("wi,wi->w", aligned[1:], aligned[:-1]) >= 0).all()
+
+
+def test_rolling_loadings_point_the_same_way(long_df):
+    for index, definition in INDEX_DEFINITIONS.items():
+        for expanding in (False, True):
+            _, loadings = rolling_index(long_df, index, width=10, expanding=expanding)
+            pc1 = loadings[list(definition["indicators"])].to_numpy()
+            assert (np.einsum("wi,wi->w", pc1[1:], pc1[:-1]) >= 0).all(), (index, expanding)
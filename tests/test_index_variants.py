@@ -0,0 +1,22 @@
+import numpy as np
+
+from Functions.index_engine import compute_index
+from Functions.index_variants import DEFAULT_VARIANTS, evaluate_variants
+
+
+def test_default_variants_match_compute_index(long_df):
+    scores, loadings = evaluate_variants(long_df)
+    assert list(scores["variant"].unique()) == list(DEFAULT_VARIANTS)
+
+    for variant, indicators in DEFAULT_VARIANTS.items():
+        expected = compute_index(long_df, {"score_column": "score", "indicators": indicators})
+        result = scores[scores["variant"] == variant].drop(columns="variant")
+        merged = expected.scores.merge(result, on=["Country Name", "Year"], suffixes=("", " variant"))
+        assert len(merged) == len(expected.scores) == len(result), variant
+        np.testing.assert_allclose(merged["score variant"], merged["score"], atol=1e-9, err_msg=variant)
+
+        weights = loadings[loadings["variant"] == variant].set_index("indicator")["loading"]
+        np.testing.assert_allclose(weights[list(indicators)].to_numpy(),
+                                   expected.loadings.iloc[0][list(indicators)].to_numpy(), atol=1e-9)
+        np.testing.assert_allclose(loadings.loc[loadings["variant"] == variant, "explained_variance_ratio"],
+                                   expected.explained_variance_ratio[0])
@@ -0,0 +1,65 @@
+import threading
+
+import numpy as np
+
+from Functions import indexing
+from Functions.functions import filter_data
+from Functions.indexing import FilterIndex, get_filter_index, get_year_index
+from Functions.versioning import register_version
+
+
+def test_aliases_share_one_range(long_df):
+    df = long_df.copy()
+    poland = df["Country Name"] == "Poland"
+    # Half of Poland's rows under an alias
+    df.loc[poland & (df["Year"] % 2 == 0), "Country Name"] = "Poland, Republic of"
+    index = FilterIndex(df)
+    expected = long_df[poland & (long_df["Indicator Name"] == "Gini index")]
+    result = index.lookup("Poland", "Gini index")
+    assert len(result) == len(expected)
+    assert np.all(np.diff(result["Year"].to_numpy()) >= 0)
+
+
+def test_rows_without_key_are_skipped(long_df):
+    df = long_df.copy()
+    df.loc[df.index[:3], "Country Name"] = None
+    index = FilterIndex(df)
+    assert sum(b - a for a, b in index.ranges.values()) == len(df) - 3
+
+
+def test_index_cache_is_thread_safe(long_df, monkeypatch):
+    monkeypatch.setattr(indexing, "_index_cache", indexing.OrderedDict())
+    frames = [long_df.assign(Value=long_df["Value"] + k) for k in range(8)]
+    for frame in frames:
+        register_version(frame)
+    errors = []
+
+    def work(k):
+        try:
+            for _ in range(20):
+                get_year_index(frames[(k + _) % len(frames)])
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len(indexing._index_cache) <= indexing._INDEX_CACHE_SIZE
+
+
+def test_unregistered_frames_are_indexed_per_call(long_df, monkeypatch):
+    monkeypatch.setattr(indexing, "_index_cache", indexing.OrderedDict())
+    df = long_df.copy()
+    keys = [("Chile", "Gini index"), ("Poland", "Birth rate, crude (per 1,000 people)")]
+    index = get_filter_index(df, keys)
+    assert set(keys) <= set(index.ranges)
+    assert not indexing._index_cache
+
+    # Edits in place are seen by the next call
+    df.loc[(df["Country Name"] == "Chile") & (df["Indicator Name"] == "Gini index"), "Value"] = -1.0
+    chile = get_filter_index(df, keys).lookup("Chile", "Gini index")
+    assert (chile["Value"] == -1.0).all()
+    np.testing.assert_array_equal(chile["Value"].to_numpy(), filter_data(df, "Chile", "Gini index")["Value"].to_numpy())
@@ -0,0 +1,77 @@
+import threading
+import time
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Functions.ingestion import ingest_sources
+
+SHEETS = {
+    "/gini": "Country Name,Indicator Name,2000,2001\nChile,Gini index,55.3,\nJapan,Gini index,32.1,32.4\n",
+    "/birth": "Country Name,Indicator Name,2000\nPoland,\"Birth rate, crude (per 1,000 people)\",9.9\n",
+    "/life": "Country Name,Indicator Name,2001\nGhana,\"Life expectancy at birth, total (years)\",57.2\n",
+}
+
+
+@pytest.fixture
+def server():
+    """
+    Local stand-in for the sheet exports: every response takes 0.3 s, unknown
+    paths answer 500. Records the highest number of requests in flight.
+    """
+    state = {"active": 0, "peak": 0, "lock": threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with state["lock"]:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.3)
+            with state["lock"]:
+                state["active"] -= 1
+            body = SHEETS.get(self.path)
+            if body is None:
+                self.send_error(500)
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body.encode())))
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _sources(url, paths):
+    return {path.strip("/"): {"url": url + path} for path in paths}
+
+
+def test_sources_are_fetched_concurrently(server):
+    timings = {}
+    df = ingest_sources(_sources(server["url"], SHEETS), max_workers=3, timings=timings)
+
+    assert server["peak"] == 3
+    assert set(timings) == {"gini", "birth", "life"}
+    assert len(df) == 5
+    # Rows come out in source order whatever order the downloads finished in
+    assert df["Indicator Name"].astype(str).tolist()[:3] == ["Gini index"] * 3
+    assert df["Year"].tolist() == [2000, 2000, 2001, 2000, 2001]
+
+
+def test_failing_source_is_skipped_or_raised(server):
+    sources = _sources(server["url"], ["/gini", "/missing", "/birth"])
+    timings = {}
+    df = ingest_sources(sources, errors="skip", timings=timings)
+    assert isinstance(timings["missing"], urllib.error.HTTPError)
+    assert sorted(df["Country Name"].astype(str).unique()) == ["Chile", "Japan", "Poland"]
+
+    with pytest.raises(urllib.error.HTTPError):
+        ingest_sources(sources, errors="raise")
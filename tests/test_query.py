@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from Functions import query
+from Functions.interning import COUNTRIES, INDICATORS
+from Functions.query import benchmark_query, panel, write_query_store
+
+
+def test_pivoted_means_average_cells_before_groups(long_df, tmp_path):
+    df = long_df.assign(**{
+        "Country Name": long_df["Country Name"].map(COUNTRIES.canonical),
+        "Indicator Name": long_df["Indicator Name"].map(INDICATORS.canonical),
+    })
+    # Repeat some rows with other values: a duplicated cell must still count once
+    extra = df[df["Country Name"] == df["Country Name"].iloc[0]].head(5).assign(Value=lambda d: d["Value"] + 100)
+    df = pd.concat([df, extra, extra, extra], ignore_index=True)
+    query = panel(write_query_store(df, str(tmp_path / "store.parquet"))).pivot()
+    wide = df.pivot_table(index=["Country Name", "Year"], columns="Indicator Name", values="Value")
+
+    for level, column in (("country", "Country Name"), ("year", "Year")):
+        expected = wide.groupby(level=column).mean()
+        result = query.mean_by(level).collect().set_index(column)[expected.columns]
+        np.testing.assert_allclose(result.sort_index(), expected.sort_index())
+    result = query.mean_by("indicator").collect().set_index("Indicator Name")["Value"]
+    np.testing.assert_allclose(result.sort_index(), wide.mean().sort_index())
+
+
+def test_benchmark_counts_arrow_buffers(long_df, tmp_path, monkeypatch):
+    monkeypatch.setattr(query, "QUERY_DIR", str(tmp_path))
+    result = benchmark_query(long_df, repeat=1).set_index("approach")
+    assert result.loc["lazy", "arrow_peak_kb"] > 0
+    np.testing.assert_allclose(result["peak_kb"], result["python_peak_kb"] + result["arrow_peak_kb"])
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from Functions.ranking import RankingEngine
+
+
+def _engine(values, labels=None):
+    labels = labels or [f"C{i}" for i in range(len(values))]
+    return RankingEngine(labels, np.asarray(values, dtype=np.float64), ["score"])
+
+
+def test_ties_share_the_competition_rank():
+    engine = _engine([3.0, 5.0, 5.0, 1.0, np.nan, 3.0], ["A", "B", "C", "D", "E", "F"])
+    ranked = engine.rank("score")
+    assert ranked["Country Name"].tolist() == ["B", "C", "A", "F", "D"]
+    assert ranked["Rank"].tolist() == [1, 1, 3, 3, 5]
+    expected = pd.Series([3.0, 5.0, 5.0, 1.0, 3.0]).rank(method="min", ascending=False)
+    assert sorted(ranked["Rank"]) == sorted(expected.astype(int))
+
+    # A top-1 selection keeps every country tied with it
+    assert engine.rank("score", top_n=1)["Country Name"].tolist() == ["B", "C"]
+    assert engine.rank("score", top_n=1, ties=False)["Rank"].tolist() == [1]
+
+    # Ascending: lowest first, ties still share
+    assert engine.rank("score", ascending=True)["Rank"].tolist() == [1, 2, 2, 4, 4]
+
+
+def test_overlapping_top_and_bottom_return_each_country_once():
+    engine = _engine([4.0, 2.0, 3.0])
+    ranked = engine.rank("score", top_n=2, bottom_n=2)
+    assert ranked["Country Name"].tolist() == ["C0", "C2", "C1"]
+    assert ranked["Rank"].tolist() == [1, 2, 3]
+
+    # More rows requested than there are countries
+    assert len(engine.rank("score", top_n=10, bottom_n=10)) == 3
+    assert engine.rank("score", bottom_n=1)["Country Name"].tolist() == ["C1"]
+
+
+def test_rank_change_against_previous_period():
+    labels = ["A", "B", "C", "D"]
+    current = _engine([4.0, 3.0, 2.0, 1.0], labels)
+    previous = _engine([1.0, 3.0, 4.0, np.nan], labels)
+    ranked = current.rank("score", previous=previous)
+    assert ranked["Previous Rank"].tolist()[:3] == [3.0, 2.0, 1.0]
+    assert np.isnan(ranked["Previous Rank"].iloc[3])
+    assert ranked["Rank Change"].tolist()[:3] == [2.0, 0.0, -2.0]
+
+    # Previous window as a frame in another country order, with a country missing
+    frame = pd.DataFrame({"Country Name": ["C", "A"], "score": [2.0, 1.0]})
+    ranked = current.rank("score", top_n=2, previous=frame)
+    assert ranked["Country Name"].tolist() == ["A", "B"]
+    assert ranked["Previous Rank"].tolist()[0] == 2.0
+    assert np.isnan(ranked["Previous Rank"].iloc[1])
@@ -0,0 +1,79 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Functions.refresh import DatasetRefresher
+from Functions.snapshot import fetch_csv, parse_csv
+
+
+@pytest.fixture
+def sheet():
+    """
+    Local stand-in for the sheet CSV export. Every request returns the request
+    number as Value; `release` gates the responses.
+    """
+    state = {"requests": 0, "release": threading.Event()}
+    state["release"].set()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            number = state["requests"]
+            state["release"].wait(5)
+            body = f"Country Name,Year,Value\nChile,2000,{number}\n".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}/export?format=csv"
+    yield state
+    state["release"].set()
+    server.shutdown()
+    server.server_close()
+
+
+def _loader(url):
+    return lambda: parse_csv(fetch_csv(url, timeout=5)[0])
+
+
+def test_concurrent_cold_gets_share_one_load(sheet):
+    refresher = DatasetRefresher(_loader(sheet["url"]))
+    sheet["release"].clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(refresher.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    sheet["release"].set()
+    for t in threads:
+        t.join(5)
+
+    assert sheet["requests"] == 1
+    assert refresher.load_count == 1
+    assert len(results) == 8 and all(r is results[0] for r in results)
+
+
+def test_stale_get_serves_cached_frame_while_refreshing(sheet):
+    refresher = DatasetRefresher(_loader(sheet["url"]), max_age=0)
+    first = refresher.get()
+    assert first["Value"].tolist() == [1]
+
+    # The refresh blocks on the stand-in; get() must not wait for it
+    sheet["release"].clear()
+    t0 = time.monotonic()
+    assert refresher.get() is first
+    assert time.monotonic() - t0 < 0.5
+
+    sheet["release"].set()
+    refreshed = refresher.refresh(wait=True)
+    assert refreshed["Value"].tolist() == [2]
+    assert refresher.load_count == 2
@@ -0,0 +1,14 @@
+import pytest
+
+from Functions import registry
+
+
+def test_every_dataset_has_its_own_snapshot():
+    names = [registry._snapshot_name(name, spec) for name, spec in registry.DATASETS.items()]
+    assert len(names) == len(set(names))
+
+
+def test_registering_a_used_snapshot_name_fails(monkeypatch):
+    monkeypatch.setattr(registry, "DATASETS", dict(registry.DATASETS))
+    with pytest.raises(ValueError):
+        registry.register_dataset("indicators_copy", registry.INDICATORS_URL, snapshot="indicators")
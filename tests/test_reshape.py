@@ -0,0 +1,54 @@
+import pandas as pd
+
+from Functions.ingestion import COUNTRIES, SOURCES, reshape_source
+from Functions.reshape import LONG_COLUMNS, detect_year_columns, melt_years
+
+
+def test_aliased_imf_country_names_are_kept():
+    imf = pd.DataFrame({
+        "COUNTRY": ["Poland, Republic of", "United States", "France"],
+        "INDICATOR": ["Unemployment rate"] * 3,
+        "2000": [16.1, 4.0, 10.2],
+        "2001": [18.3, None, 8.6],
+    })
+    long_df = reshape_source(imf, SOURCES["IMF_data_df"], countries=COUNTRIES)
+
+    assert sorted(long_df["Country Name"].astype(str).unique()) == ["Poland", "United States"]
+    poland = long_df[long_df["Country Name"] == "Poland"]
+    assert poland["Year"].tolist() == [2000, 2001]
+    assert poland["Value"].tolist() == [16.1, 18.3]
+    assert set(long_df["Indicator Name"].astype(str)) == {"Unemployment levels (%)"}
+
+
+def test_year_columns_are_detected():
+    columns = ["Country Name", "Indicator Code", "1960", " 1999 ", "2000 [YR2000]", "2001[YR2001]",
+               "199", "20001", "Year 2002", 2003]
+    assert detect_year_columns(columns) == {"1960": 1960, " 1999 ": 1999, "2000 [YR2000]": 2000,
+                                            "2001[YR2001]": 2001, 2003: 2003}
+
+    wdi = pd.DataFrame({
+        "Country Name": ["Chile"], "Indicator Name": ["Gini index"], "Indicator Code": ["SI.POV.GINI"],
+        "2000 [YR2000]": ["55.3"], "2001 [YR2001]": [".."], "2002 [YR2002]": ["54.1"],
+    })
+    long_df = melt_years([(wdi, {})], categorical=False)
+    assert list(long_df.columns) == LONG_COLUMNS
+    assert long_df["Year"].tolist() == [2000, 2002]
+    assert long_df["Value"].tolist() == [55.3, 54.1]
+
+
+def test_indicator_map_renames_and_drops():
+    imf = pd.DataFrame({
+        "COUNTRY": ["Chile", "Chile", "Japan"],
+        "INDICATOR": ["Unemployment rate", "Current account balance", " Unemployment rate "],
+        "2000": [8.3, -1.2, 4.7],
+    })
+    spec = {"country_col": "COUNTRY", "indicator_col": "INDICATOR",
+            "indicator_map": {"Unemployment rate": "Unemployment levels (%)"}}
+    long_df = melt_years([(imf, spec)], categorical=False)
+    assert long_df["Country Name"].tolist() == ["Chile", "Japan"]
+    assert long_df["Indicator Name"].tolist() == ["Unemployment levels (%)"] * 2
+
+    # Without a map the source names are kept (stripped)
+    unmapped = melt_years([(imf, {"country_col": "COUNTRY", "indicator_col": "INDICATOR"})], categorical=False)
+    assert unmapped["Indicator Name"].tolist() == ["Unemployment rate", "Current account balance",
+                                                   "Unemployment rate"]
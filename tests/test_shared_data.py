@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from Functions import shared_data
+from Functions.interning import intern_labels
+
+
+def _load_in_worker(shared_dir, counter_path):
+    shared_data.SHARED_DIR = shared_dir
+
+    def load():
+        with open(counter_path, "a") as f:
+            f.write("x")
+        time.sleep(0.2)
+        return pd.DataFrame({"Year": [2000, 2001], "Value": [1.0, 2.0]})
+
+    assert len(shared_data.load_shared("indicators", load)) == 2
+
+
+@pytest.mark.skipif(shared_data.fcntl is None, reason="needs fcntl")
+def test_only_one_worker_loads_after_expiry(tmp_path):
+    counter = tmp_path / "loads"
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_load_in_worker, args=(str(tmp_path / "shared"), str(counter)))
+               for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert all(w.exitcode == 0 for w in workers)
+    assert counter.read_text() == "x"
+    assert os.path.exists(tmp_path / "shared" / "indicators.arrow")
+
+
+def test_publish_attach_round_trip_keeps_missing_labels(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_data, "SHARED_DIR", str(tmp_path))
+    df = intern_labels(pd.DataFrame({
+        "Country Name": ["Chile", None, "Peru"],
+        "Year": [2000, 2001, 2002],
+        "Value": [1.0, float("nan"), 3.0],
+    }))
+    shared_data.publish_shared(df, "overview")
+    attached = shared_data.attach_shared("overview")
+
+    assert attached["Country Name"].isna().tolist() == [False, True, False]
+    assert attached["Country Name"].astype(object)[[0, 2]].tolist() == ["Chile", "Peru"]
+    assert attached["Year"].tolist() == [2000, 2001, 2002]
+    assert attached["Value"].isna().tolist() == [False, True, False]
@@ -0,0 +1,30 @@
+import pytest
+
+from Functions import snapshot
+from Functions.snapshot import LONG_SCHEMA, load_with_snapshot, read_snapshot, write_snapshot
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("raw", [
+    b'Country Name,Indicator Name,Year,Value\n"Chile,GDP\n',  # unterminated quote
+    b"<html><body>Service unavailable</body></html>",  # off-schema
+    b"",  # empty body
+])
+def test_bad_download_keeps_last_good_snapshot(long_df, snapshot_dir, monkeypatch, raw):
+    write_snapshot(long_df, "indicators", LONG_SCHEMA, meta={"sha256": "old"})
+    monkeypatch.setattr(snapshot, "fetch_csv", lambda url, etag=None, timeout=30: (raw, None))
+
+    df = load_with_snapshot("http://example.invalid/sheet.csv", "indicators", LONG_SCHEMA, max_age=0)
+    assert len(df) == len(long_df)
+    assert len(read_snapshot("indicators")) == len(long_df)
+
+
+def test_bad_download_without_snapshot_raises(snapshot_dir, monkeypatch):
+    monkeypatch.setattr(snapshot, "fetch_csv", lambda url, etag=None, timeout=30: (b"<html></html>", None))
+    with pytest.raises(ValueError):
+        load_with_snapshot("http://example.invalid/sheet.csv", "indicators", LONG_SCHEMA)
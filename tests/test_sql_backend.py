@@ -0,0 +1,27 @@
+import numpy as np
+
+from Functions.functions import filter_data
+from Functions.sql_backend import IndicatorDB
+
+
+def _rows(frame):
+    rows = frame[["Year", "Value"]].to_numpy(dtype=np.float64)
+    return rows[np.lexsort((np.nan_to_num(rows[:, 1], nan=np.inf), rows[:, 0]))]
+
+
+def test_indicator_db_matches_dataframe_for_every_indicator(long_df):
+    db = IndicatorDB(long_df, engine="sqlite")
+    pairs = long_df[["Country Name", "Indicator Name"]].drop_duplicates().itertuples(index=False)
+    for country, indicator in pairs:
+        expected = filter_data(long_df, country, indicator)
+        result = filter_data(db, country, indicator)
+        assert len(expected) > 0, (country, indicator)
+        np.testing.assert_array_equal(_rows(result), _rows(expected), err_msg=f"{country} / {indicator}")
+
+
+def test_indicator_db_resolves_aliases(long_df):
+    db = IndicatorDB(long_df, engine="sqlite")
+    raw = db.series(["Chile"], "Inflation (CPI))")
+    assert len(raw) == len(db.series(["Chile"], "Inflation (CPI, %)")) > 0
+    means = db.means("Inflation (CPI))", countries=["United States of America"])
+    assert means["Country Name"].tolist() == ["United States"]
@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+
+from Functions.window_aggregates import WindowAggregates
+
+
+def test_rows_without_country_are_ignored():
+    df = pd.DataFrame({
+        "Country Name": ["Chile", "Peru", None, "Peru"],
+        "Year": [2000, 2000, 2000, 2001],
+        "score": [1.0, 2.0, 100.0, 4.0],
+    })
+    means = WindowAggregates(df, ["score"]).window_means().set_index("Country Name")["score"]
+    assert means.to_dict() == {"Chile": 1.0, "Peru": 3.0}
+    expected = df.dropna(subset=["Country Name"]).groupby("Country Name")["score"].mean()
+    np.testing.assert_allclose(means.sort_index(), expected.sort_index())